@@ -1,22 +1,40 @@
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
+from flask_socketio import SocketIO
+from .ephemeris import configure_ephemeris
 
 db = SQLAlchemy()
 migrate = Migrate()
+socketio = SocketIO()
 
 def create_app():
     app = Flask(__name__)
     app.config.from_object("config.Config")
 
+    configure_ephemeris(app.config["EPHEMERIS_PATH"], app.config["EPHEMERIS_TIER"])
+
     db.init_app(app)
     migrate.init_app(app, db)
+    socketio.init_app(app)
 
     from .routes import main
     app.register_blueprint(main)
 
+    from .bulk import charts_cli
+    app.cli.add_command(charts_cli)
+
+    from .transits import transits_cli
+    app.cli.add_command(transits_cli)
+
+    from .human_design_table import human_design_cli
+    app.cli.add_command(human_design_cli)
+
+    from .ascendant import ascendant_cli
+    app.cli.add_command(ascendant_cli)
+
     with app.app_context():
-        from . import routes
+        from . import routes, live_sky
         db.create_all()
 
     from . import models
@@ -1,44 +1,74 @@
-from transformers import GPT2LMHeadModel, GPT2Tokenizer
+from functools import lru_cache
 
 # Load the lightweight GPT-2 model
-model_name = "distilgpt2"  # Use distilgpt2 for lightweight needs
-
-#Basic model
-tokenizer = GPT2Tokenizer.from_pretrained(model_name)
-model = GPT2LMHeadModel.from_pretrained(model_name)
+MODEL_NAME = "distilgpt2"  # Use distilgpt2 for lightweight needs
 
 #Trained model
-# model = GPT2LMHeadModel.from_pretrained("./fine_tuned_distilgpt2")
-# tokenizer = GPT2Tokenizer.from_pretrained("./fine_tuned_distilgpt2")
+# MODEL_NAME = "./fine_tuned_distilgpt2"
 
-def generate_local_description(sun_sign, rising_sign):
+PROMPT_TEMPLATE = (
+    "Write a short astrological description for a person with Sun in {sun_sign} "
+    "and Rising Sign in {rising_sign}. Describe how these traits complement each other."
+)
+
+GENERATION_PARAMS = {
+    "max_length": 100,  # Maximum length of the response
+    "temperature": 0.7,  # Creativity level
+    "top_p": 0.9,  # Nucleus sampling
+    "do_sample": True,  # Enable sampling
+}
+
+@lru_cache(maxsize=None)
+def load_model():
     """
-    Generate a description for astrology details using a local GPT-2 model.
+    Load the tokenizer and model once, on first use.
+
+    Returns:
+        tuple: (tokenizer, model)
+    """
+    from transformers import GPT2LMHeadModel, GPT2Tokenizer
+
+    tokenizer = GPT2Tokenizer.from_pretrained(MODEL_NAME)
+    model = GPT2LMHeadModel.from_pretrained(MODEL_NAME)
+    return tokenizer, model
+
+def build_prompt(sun_sign, rising_sign):
+    """Build the generation prompt for a Sun / Rising combination."""
+    return PROMPT_TEMPLATE.format(sun_sign=sun_sign, rising_sign=rising_sign)
+
+def generate_local_descriptions(sun_sign, rising_sign, count=1):
+    """
+    Generate several description variants for astrology details using a local GPT-2 model.
     Args:
         sun_sign (str): The user's sun sign.
         rising_sign (str): The user's rising sign.
+        count (int): Number of variants to sample from a single prompt.
     Returns:
-        str: Generated description.
+        list: Generated descriptions.
     """
-    # Create a prompt for the model
-    prompt = (
-        f"Write a short astrological description for a person with Sun in {sun_sign} "
-        f"and Rising Sign in {rising_sign}. Describe how these traits complement each other."
-    )
+    tokenizer, model = load_model()
 
     # Encode the input prompt
-    inputs = tokenizer.encode(prompt, return_tensors="pt")
+    inputs = tokenizer.encode(build_prompt(sun_sign, rising_sign), return_tensors="pt")
 
     # Generate text using the model
     outputs = model.generate(
         inputs,
-        max_length=100,  # Maximum length of the response
-        num_return_sequences=1,  # Return one response
-        temperature=0.7,  # Creativity level
-        top_p=0.9,  # Nucleus sampling
-        do_sample=True,  # Enable sampling
+        num_return_sequences=count,
+        pad_token_id=tokenizer.eos_token_id,
+        **GENERATION_PARAMS,
     )
 
     # Decode the generated text
-    description = tokenizer.decode(outputs[0], skip_special_tokens=True)
-    return description
\ No newline at end of file
+    return [tokenizer.decode(output, skip_special_tokens=True) for output in outputs]
+
+def generate_local_description(sun_sign, rising_sign):
+    """
+    Generate a description for astrology details using a local GPT-2 model.
+    Args:
+        sun_sign (str): The user's sun sign.
+        rising_sign (str): The user's rising sign.
+    Returns:
+        str: Generated description.
+    """
+    return generate_local_descriptions(sun_sign, rising_sign, count=1)[0]
\ No newline at end of file
@@ -0,0 +1,179 @@
+import math
+
+import click
+import numpy as np
+import swisseph as swe
+from flask.cli import AppGroup
+
+ascendant_cli = AppGroup("ascendant", help="Ascendant calculation checks.")
+
+# The Ascendant depends only on the local sidereal time (as ARMC, in degrees),
+# the latitude and the true obliquity of the ecliptic, so it is computed in
+# closed form instead of through a full swe.houses call. Most of that call's
+# time goes into the nutation series (for the true obliquity and the apparent
+# sidereal time), which changes slowly. The true obliquity and the apparent
+# sidereal time's offset from a uniform Earth rotation are tabulated every
+# NUTATION_STEP (half a day), in blocks built on first use, and interpolated
+# linearly; both scalar and vectorized lookups read the same table.
+NUTATION_STEP = 0.5  # days
+NUTATION_BLOCK_DAYS = 512
+# Earth rotation angle per UT day (IERS 2003); what is left of the sidereal time varies slowly
+EARTH_ROTATION = 360.98561228808763  # degrees per day
+# Inside the polar circles Placidus houses are undefined and swe.houses raises;
+# the closed form also loses precision toward the poles (tan(latitude)), so
+# beyond this latitude swe.houses is used and its error surfaces as before.
+LATITUDE_LIMIT = 66
+# Largest difference from swe.houses, as measured by `flask ascendant check`
+MAX_ERROR = 0.1 / 3600  # degrees
+
+_nutation_blocks = {}
+
+def _nutation_block(block):
+    # Rows of obliquity and sidereal offset at every step of a block,
+    # endpoints included, as lists (scalar lookups) and as an array
+    # (vectorized lookups)
+    samples = _nutation_blocks.get(block)
+    if samples is None:
+        first_day = block * NUTATION_BLOCK_DAYS
+        steps = round(NUTATION_BLOCK_DAYS / NUTATION_STEP)
+        table = np.empty((2, steps + 1))
+        for k in range(steps + 1):
+            days = k * NUTATION_STEP
+            row = swe.calc_ut(first_day + days, swe.ECL_NUT)[0]
+            sidereal = swe.sidtime0(first_day + days, row[0], row[2]) * 15
+            table[:, k] = row[0], sidereal - EARTH_ROTATION * days
+        table[1] = np.unwrap(table[1], period=360)
+        # Concurrent first uses may both build a block; either copy is kept
+        samples = _nutation_blocks.setdefault(block, (table.tolist(), table))
+    return samples
+
+def _table_position(julian_day):
+    # Block, step index and fraction of a step for a Julian day
+    block = int(julian_day // NUTATION_BLOCK_DAYS)
+    position = (julian_day - block * NUTATION_BLOCK_DAYS) / NUTATION_STEP
+    k = int(position)
+    return block, k, position - k
+
+def sidereal_angles(julian_day, longitude):
+    """
+    ARMC (local sidereal time in degrees) and true obliquity for a Julian day (UT),
+    interpolated from the half-day table.
+    """
+    block, k, fraction = _table_position(julian_day)
+    (obliquities, offsets), _ = _nutation_block(block)
+    obliquity = obliquities[k] + (obliquities[k + 1] - obliquities[k]) * fraction
+    offset = offsets[k] + (offsets[k + 1] - offsets[k]) * fraction
+    rotation = EARTH_ROTATION * (julian_day - block * NUTATION_BLOCK_DAYS)
+    return (offset + rotation + longitude) % 360, obliquity
+
+def sidereal_angles_array(julian_days, longitudes):
+    """Vectorized `sidereal_angles` over arrays of the same shape."""
+    blocks = np.floor_divide(julian_days, NUTATION_BLOCK_DAYS).astype(np.int64)
+    days_into_block = julian_days - blocks * NUTATION_BLOCK_DAYS
+    positions = days_into_block / NUTATION_STEP
+    steps = positions.astype(np.int64)
+    fractions = positions - steps
+
+    obliquities = np.empty_like(julian_days)
+    offsets = np.empty_like(julian_days)
+    # Charts usually fall in a few blocks, so gather one block at a time
+    for block in np.unique(blocks):
+        mask = blocks == block
+        _, table = _nutation_block(int(block))
+        k, fraction = steps[mask], fractions[mask]
+        obliquities[mask] = table[0, k] + (table[0, k + 1] - table[0, k]) * fraction
+        offsets[mask] = table[1, k] + (table[1, k + 1] - table[1, k]) * fraction
+
+    armcs = (offsets + EARTH_ROTATION * days_into_block + longitudes) % 360
+    return armcs, obliquities
+
+def ascendant_from_armc(armc, latitude, obliquity):
+    """
+    Ascendant in degrees (0-360) from ARMC, latitude and obliquity.
+
+    Matches `ascmc[0]` of swe.houses_armc for |latitude| <= LATITUDE_LIMIT.
+    """
+    armc, latitude, obliquity = math.radians(armc), math.radians(latitude), math.radians(obliquity)
+    ascendant = math.atan2(
+        math.cos(armc),
+        -(math.sin(armc) * math.cos(obliquity) + math.tan(latitude) * math.sin(obliquity)),
+    )
+    return math.degrees(ascendant) % 360
+
+def ascendants_from_armc(armcs, latitudes, obliquities):
+    """Vectorized `ascendant_from_armc` over broadcastable arrays."""
+    armcs, latitudes, obliquities = np.radians(armcs), np.radians(latitudes), np.radians(obliquities)
+    ascendants = np.arctan2(
+        np.cos(armcs),
+        -(np.sin(armcs) * np.cos(obliquities) + np.tan(latitudes) * np.sin(obliquities)),
+    )
+    return np.degrees(ascendants) % 360
+
+def ascendant_at(julian_day, latitude, longitude):
+    """
+    Ascendant in degrees (0-360) for a Julian day (UT) and location.
+
+    Raises:
+        swisseph.Error: Inside the polar circles, as swe.houses does for Placidus houses.
+    """
+    if abs(latitude) > LATITUDE_LIMIT:
+        return swe.houses(julian_day, latitude, longitude, b'P')[1][0] % 360
+    armc, obliquity = sidereal_angles(julian_day, longitude)
+    return ascendant_from_armc(armc, latitude, obliquity)
+
+def ascendants(julian_days, latitudes, longitudes):
+    """
+    Vectorized `ascendant_at` for a batch of charts.
+
+    Args:
+        julian_days (array): Julian days (UT).
+        latitudes (float or array): Latitudes, broadcast against `julian_days`.
+        longitudes (float or array): Longitudes, broadcast against `julian_days`.
+
+    Returns:
+        numpy.ndarray: Ascendants in degrees (0-360).
+    """
+    julian_days, latitudes, longitudes = np.broadcast_arrays(
+        np.asarray(julian_days, dtype=float),
+        np.asarray(latitudes, dtype=float),
+        np.asarray(longitudes, dtype=float),
+    )
+    armcs, obliquities = sidereal_angles_array(julian_days, longitudes)
+    result = ascendants_from_armc(armcs, latitudes, obliquities)
+
+    for index in zip(*np.nonzero(np.abs(latitudes) > LATITUDE_LIMIT)):
+        result[index] = swe.houses(julian_days[index], latitudes[index], longitudes[index], b'P')[1][0] % 360
+    return result
+
+def measure_error(samples=100_000, start_year=1800, end_year=2200, seed=0):
+    """
+    Largest difference (degrees) between `ascendants` and swe.houses over random charts.
+
+    Args:
+        samples (int): Number of random charts.
+        start_year (int): First year of the random birth dates.
+        end_year (int): Last year of the random birth dates.
+        seed (int): Random seed.
+    """
+    rng = np.random.default_rng(seed)
+    julian_days = rng.uniform(swe.julday(start_year, 1, 1, 0.0), swe.julday(end_year, 12, 31, 24.0), samples)
+    latitudes = rng.uniform(-LATITUDE_LIMIT, LATITUDE_LIMIT, samples)
+    longitudes = rng.uniform(-180, 180, samples)
+
+    references = np.array([
+        swe.houses(julian_day, latitude, longitude, b'P')[1][0]
+        for julian_day, latitude, longitude in zip(julian_days, latitudes, longitudes)
+    ])
+    errors = (ascendants(julian_days, latitudes, longitudes) - references + 180) % 360 - 180
+    return float(np.max(np.abs(errors)))
+
+@ascendant_cli.command("check")
+@click.option("--samples", type=int, default=100_000, show_default=True, help="Random charts to compare.")
+@click.option("--start-year", type=int, default=1800, show_default=True)
+@click.option("--end-year", type=int, default=2200, show_default=True)
+def check(samples, start_year, end_year):
+    """Compare the closed-form Ascendant with swe.houses over random charts."""
+    error = measure_error(samples, start_year, end_year)
+    click.echo(f"Max error: {error * 3600:.3f}\" (bound {MAX_ERROR * 3600:.1f}\")")
+    if error > MAX_ERROR:
+        raise click.ClickException("Ascendant error exceeds MAX_ERROR")
@@ -4,6 +4,9 @@ from timezonefinder import TimezoneFinder
 from datetime import datetime
 import json
 import os
+import threading
+from app.ascendant import ascendant_at
+from app.ephemeris import calc_ut
 
 def convert_to_dms(decimal_degrees):
     """
@@ -37,6 +40,20 @@ def validate_time(time_string):
     except ValueError:
         return False
     
+_timezone_finders = threading.local()
+
+def get_timezone_finder():
+    """
+    Return this thread's TimezoneFinder, creating it on first use.
+
+    Creating one takes ~13ms (far more than a lookup), and an instance reads
+    its data file with seeks, so each thread keeps its own.
+    """
+    tf = getattr(_timezone_finders, "instance", None)
+    if tf is None:
+        tf = _timezone_finders.instance = TimezoneFinder()
+    return tf
+
 def get_timezone_from_coordinates(latitude, longitude):
     """
     Get the IANA time zone name based on latitude and longitude.
@@ -48,12 +65,24 @@ def get_timezone_from_coordinates(latitude, longitude):
     Returns:
         str: IANA time zone name (e.g., "Europe/Bucharest").
     """
-    tf = TimezoneFinder()
+    tf = get_timezone_finder()
     timezone_name = tf.timezone_at(lat=latitude, lng=longitude)
     if timezone_name is None:
         raise ValueError(f"Could not determine time zone for coordinates: {latitude}, {longitude}")
     return timezone_name
 
+ZODIAC_SIGNS = [
+    "Aries", "Taurus", "Gemini", "Cancer", "Leo", "Virgo",
+    "Libra", "Scorpio", "Sagittarius", "Capricorn", "Aquarius", "Pisces"
+]
+
+RULING_PLANETS = {
+    "Aries": "Mars", "Taurus": "Venus", "Gemini": "Mercury", "Cancer": "Moon",
+    "Leo": "Sun", "Virgo": "Mercury", "Libra": "Venus", "Scorpio": "Mars/Pluto",
+    "Sagittarius": "Jupiter", "Capricorn": "Saturn", "Aquarius": "Saturn/Uranus",
+    "Pisces": "Jupiter/Neptune"
+}
+
 # ? ASTROLOGY SIGN
 def get_astrological_sign(longitude):
     """
@@ -69,27 +98,22 @@ def get_astrological_sign(longitude):
     if isinstance(longitude, tuple):
         longitude = longitude[0] 
         
-    signs = [
-        "Aries", "Taurus", "Gemini", "Cancer", "Leo", "Virgo",
-        "Libra", "Scorpio", "Sagittarius", "Capricorn", "Aquarius", "Pisces"
-    ]
     index = int(longitude // 30)  # Each zodiac sign spans 30 degrees
-    return signs[index]
+    return ZODIAC_SIGNS[index]
 
-# ? ASTROLOGY ASCENDANT
-def calculate_ascendant(dob, birth_time, latitude, longitude):
+# ? BIRTH TIME
+def get_utc_julian_day(dob, birth_time, latitude, longitude):
     """
-    Calculate the Ascendant (Rising Sign), considering DST and local time zone.
+    Convert a local birth time to a UTC Julian day, considering DST and local time zone.
 
     Args:
         dob (str): Date of birth in YYYY-MM-DD format.
         birth_time (str): Time of birth in HH:MM format (24-hour).
         latitude (float): Latitude of birth location.
         longitude (float): Longitude of birth location.
-        tz_name (str): Time zone name (e.g., "Europe/Bucharest").
 
     Returns:
-        tuple: Ascendant sign and degree.
+        float: Julian day number (UT).
     """
     timezone_name = get_timezone_from_coordinates(latitude, longitude)
     print(f"Time Zone: {timezone_name}")
@@ -105,35 +129,32 @@ def calculate_ascendant(dob, birth_time, latitude, longitude):
     utc_datetime = localized_datetime.astimezone(utc)
 
     # Convert UTC time to Julian day
-    julian_day = swe.julday(
+    return swe.julday(
         utc_datetime.year,
         utc_datetime.month,
         utc_datetime.day,
         utc_datetime.hour + utc_datetime.minute / 60
     )
 
-    # Calculate Local Sidereal Time (LST) directly
-    gst = swe.sidtime(julian_day)  # GST in decimal hours
-    print(f"GST (hours): {gst}")
-    
-    longitude_in_hours = longitude / 15  # Convert longitude to hours
-    local_sidereal_time = (gst + longitude_in_hours) % 24  # Normalize LST to 24-hour format
-    
-    # Convert LST to degrees (360° corresponds to 24 hours)
-    lst_in_degrees = local_sidereal_time * 15
-    print(f"LST (in hours): {local_sidereal_time}")
-    print(f"LST (in degrees): {lst_in_degrees}")
-
-    # Use Swiss Ephemeris to calculate the Ascendant based on LST
-    house_cusps, ascendant_info = swe.houses(julian_day, latitude, longitude, b'P')
-    ascendant_degree = ascendant_info[0]
-    print(f"Ascendant Degree (Raw): {ascendant_degree}")
-    
-	# Validate if Ascendant Degree needs adjustments
-    if ascendant_degree < 0:
-        ascendant_degree += 360  # Ensure it's in the 0°–360° range
-        
-    print(f"Adjusted Ascendant Degree: {ascendant_degree}")
+# ? ASTROLOGY ASCENDANT
+def calculate_ascendant(julian_day, latitude, longitude):
+    """
+    Calculate the Ascendant (Rising Sign) without the house cusps.
+
+    Uses the closed-form `ascendant_at`; a chart that also needs the houses
+    takes the Ascendant from its swe.houses call instead, so the two agree.
+
+    Args:
+        julian_day (float): Julian day number (UT) of the birth.
+        latitude (float): Latitude of birth location.
+        longitude (float): Longitude of birth location.
+
+    Returns:
+        tuple: Ascendant sign and degree.
+    """
+    # The Ascendant follows from the local sidereal time, latitude and obliquity
+    ascendant_degree = ascendant_at(julian_day, latitude, longitude)
+    print(f"Ascendant Degree: {ascendant_degree}")
         
     ascendant_sign = get_astrological_sign(ascendant_degree)
     
@@ -175,18 +196,15 @@ def determine_house(longitude, house_cusps):
     Determine which house a celestial body is in based on its longitude
     and calculate the degree within the house.
     """
-    for i in range(len(house_cusps) - 1):
-        if house_cusps[i] <= longitude < house_cusps[i + 1]:
-            house_number = i + 1
-            degree_in_house = longitude - house_cusps[i]
-            return house_number, degree_in_house
-    if longitude >= house_cusps[-1]:
-        house_number = 12
-        degree_in_house = longitude - house_cusps[-1]
-    else:
-        house_number = 1
-        degree_in_house = longitude + (360 - house_cusps[-1])
-    return house_number, degree_in_house
+    for i in range(len(house_cusps)):
+        # Measured from the cusp, so a house spanning 0° Aries needs no special case
+        house_start = house_cusps[i]
+        house_size = (house_cusps[(i + 1) % len(house_cusps)] - house_start) % 360
+        degree_in_house = (longitude - house_start) % 360
+        if degree_in_house < house_size:
+            return i + 1, degree_in_house
+    # Only reached through rounding at a cusp; it belongs to the last house
+    return len(house_cusps), (longitude - house_cusps[-1]) % 360
 
 
 def get_house_info(house_number):
@@ -213,37 +231,45 @@ def get_house_info(house_number):
 
 
 # ? ASTROLOGY DETAILS
-def calculate_astrology_details(dob, birth_time, latitude, longitude):
+def calculate_astrology_details(dob, birth_time, latitude, longitude, tier=None):
+    """
+    Calculate the astrology details for a birth.
+
+    Args:
+        dob (str): Date of birth in YYYY-MM-DD format.
+        birth_time (str): Time of birth in HH:MM format (24-hour).
+        latitude (float): Latitude of birth location.
+        longitude (float): Longitude of birth location.
+        tier (str): Ephemeris precision tier ("fast" or "precise", None for the default).
+
+    Returns:
+        dict: Sun sign, Ascendant, element, houses and related details.
+    """
     try:
         
-        # Combine date and time of birth into a single datetime object
-        birth_datetime = datetime.strptime(f"{dob} {birth_time}", "%Y-%m-%d %H:%M")
-
-        # Convert to Julian day
-        julian_day = swe.julday(
-            birth_datetime.year, birth_datetime.month, birth_datetime.day,
-            birth_datetime.hour + birth_datetime.minute / 60
-        )
+        # Convert the local birth time to a UTC Julian day
+        julian_day = get_utc_julian_day(dob, birth_time, latitude, longitude)
 
         # Set geographic location
         swe.set_topo(longitude, latitude, 0)  # Longitude, Latitude, Altitude (0 for sea level)
 
         # Calculate Sun Sign
-        sun_position, _ = swe.calc_ut(julian_day, swe.SUN)
+        sun_position = calc_ut(julian_day, swe.SUN, tier)
         print(f"Sun Position (decimal degrees): {sun_position[0]}")
         sun_sign = get_astrological_sign(sun_position[0])
         sun_position_dms = convert_to_dms(sun_position[0])  # Format Sun's degree as DMS
 
-        # Calculate Ascendant
-        ascendant_sign, ascendant_degree = calculate_ascendant(dob, birth_time, latitude, longitude)
+        # Calculate Houses
+        house_cusps, ascmc = swe.houses(julian_day, latitude, longitude, b'P')  # Placidus house system
+
+        # Calculate Ascendant (from the same call, so it sits exactly on the House 1 cusp)
+        ascendant_degree = ascmc[0]
+        ascendant_sign = get_astrological_sign(ascendant_degree)
         ascendant_position_dms = convert_to_dms(ascendant_degree)  # Format Ascendant's degree as DMS
         
 		# Calculate Element
         element = get_element(sun_sign)
 
-        # Calculate Houses
-        house_cusps, _ = swe.houses(julian_day, latitude, longitude, b'P')  # Placidus house system
-        
 		# Determine the Sun and Ascendant houses with degrees
         sun_house, sun_house_degree = determine_house(sun_position[0], house_cusps)
         ascendant_house, ascendant_house_degree = determine_house(ascendant_degree, house_cusps)
@@ -253,17 +279,12 @@ def calculate_astrology_details(dob, birth_time, latitude, longitude):
         ascendant_house_title, ascendant_house_description = get_house_info(ascendant_house)
 
         # Calculate ruling planet
-        ruling_planets = {
-            "Aries": "Mars", "Taurus": "Venus", "Gemini": "Mercury", "Cancer": "Moon",
-            "Leo": "Sun", "Virgo": "Mercury", "Libra": "Venus", "Scorpio": "Mars/Pluto",
-            "Sagittarius": "Jupiter", "Capricorn": "Saturn", "Aquarius": "Saturn/Uranus",
-            "Pisces": "Jupiter/Neptune"
-        }
-        ruling_planet = ruling_planets.get(sun_sign, "Unknown")
+        ruling_planet = RULING_PLANETS.get(sun_sign, "Unknown")
 
         return {
             "sun_sign": sun_sign,
             "sun_position_dms": sun_position_dms,
+            "sun_degree": sun_position[0],
             "rising_sign": ascendant_sign,
             "ascendant_position_dms": ascendant_position_dms,
             "ascendant_degree": ascendant_degree,
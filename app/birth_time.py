@@ -0,0 +1,169 @@
+from datetime import datetime
+
+import numpy as np
+import swisseph as swe
+
+from app.astrology import ZODIAC_SIGNS, determine_house, get_house_info, get_timezone_from_coordinates
+from app.ephemeris import calc_ut, resolve_tier
+from app.human_design import (
+    PLANETS,
+    determine_authority,
+    determine_definition,
+    determine_human_design_type,
+    determine_incarnation_cross,
+    determine_profile,
+)
+from app.tz_tables import local_to_julian_day
+
+MINUTES_PER_DAY = 1440
+
+# Bodies slow enough to interpolate across one day (the Moon moves ~13°/day and is recomputed)
+SLOW_BODIES = [planet for planet in PLANETS if planet != "MOON"]
+
+# Fields of each outcome, grouped as in the response
+ASTROLOGY_FIELDS = ["rising_sign", "sun_sign", "sun_house", "ascendant_house"]
+HUMAN_DESIGN_FIELDS = ["type", "authority", "profile", "definition", "incarnation_cross"]
+
+def _wrap(delta):
+    return (delta + 180) % 360 - 180
+
+class SlowBodyInterpolator:
+    """
+    Quadratic interpolation of slow-body longitudes across a short window.
+
+    Positions are computed at the start, middle and end of the window; over
+    about a day the interpolation error is far below a gate line (0.94°).
+    """
+
+    def __init__(self, start, end, tier):
+        self.start = start
+        self.span = end - start
+        samples = np.array([
+            [calc_ut(julian_day, getattr(swe, body), tier)[0] for body in SLOW_BODIES]
+            for julian_day in (start, start + self.span / 2, end)
+        ])
+        # Unwrap so a body crossing 0° Aries interpolates along the short arc
+        samples[1] = samples[0] + _wrap(samples[1] - samples[0])
+        samples[2] = samples[1] + _wrap(samples[2] - samples[1])
+        self.samples = samples
+
+    def positions(self, julian_day):
+        """Longitudes (degrees) of the slow bodies, keyed by planet."""
+        u = (julian_day - self.start) / self.span
+        weights = np.array([(2 * u - 1) * (u - 1), 4 * u * (1 - u), u * (2 * u - 1)])
+        longitudes = (weights @ self.samples) % 360
+        return dict(zip(SLOW_BODIES, longitudes.tolist()))
+
+def _minute_label(minute):
+    return f"{minute // 60:02d}:{minute % 60:02d}"
+
+def calculate_birth_time_ranges(dob, latitude, longitude, tier=None, step=5):
+    """
+    Find every distinct chart outcome across the 1440 minutes of a birth date.
+
+    Slow bodies are interpolated across the day; only the Ascendant, house
+    cusps and Moon are recomputed. The day is sampled every `step` minutes
+    and each change between samples is bisected down to the exact minute.
+    Julian days are derived as in `calculate_astrology_details` and
+    `calculate_human_design`, so each range matches a full chart computed
+    for any minute inside it.
+
+    Args:
+        dob (str): Date of birth in YYYY-MM-DD format.
+        latitude (float): Latitude of birth location.
+        longitude (float): Longitude of birth location.
+        tier (str): Ephemeris precision tier ("fast" or "precise", None for the default).
+        step (int): Minutes between coarse samples.
+
+    Returns:
+        dict: "segments" (runs of identical outcomes with start/end times),
+            plus "astrology" and "human_design", mapping each field to its
+            distinct values and the time ranges for each.
+
+    Raises:
+        ValueError: If the date or location is invalid.
+    """
+    tier = resolve_tier(tier)
+    datetime.strptime(dob, "%Y-%m-%d")  # Validate the date
+    timezone_name = get_timezone_from_coordinates(latitude, longitude)
+
+    minutes = np.arange(MINUTES_PER_DAY)
+    utc_days = local_to_julian_day(timezone_name, [dob] * MINUTES_PER_DAY, [_minute_label(m) for m in minutes])
+
+    slow_bodies = SlowBodyInterpolator(utc_days[0], utc_days[-1], tier)
+    outcomes = {}
+
+    def outcome(minute):
+        if minute in outcomes:
+            return outcomes[minute]
+        utc_day = float(utc_days[minute])
+
+        # The Ascendant comes from the same call as the cusps, as in a full chart
+        house_cusps, ascmc = swe.houses(utc_day, latitude, longitude, b'P')
+        ascendant = ascmc[0]
+
+        positions = slow_bodies.positions(utc_day)
+        sun = positions["SUN"]
+        positions["MOON"] = calc_ut(utc_day, swe.MOON, tier)[0]
+        positions["EARTH"] = (positions["SUN"] + 180) % 360
+        type_ = determine_human_design_type(positions)
+
+        outcomes[minute] = (
+            ZODIAC_SIGNS[int(ascendant // 30)],
+            ZODIAC_SIGNS[int(sun // 30)],
+            determine_house(sun, house_cusps)[0],
+            determine_house(ascendant, house_cusps)[0],
+            type_,
+            determine_authority(type_, positions),
+            determine_profile(positions),
+            determine_definition(positions),
+            determine_incarnation_cross(positions),
+        )
+        return outcomes[minute]
+
+    def change_points(first, last):
+        # Minutes in (first, last] where the outcome differs from the minute before
+        if outcome(first) == outcome(last):
+            return []
+        if last - first == 1:
+            return [last]
+        middle = (first + last) // 2
+        return change_points(first, middle) + change_points(middle, last)
+
+    samples = list(range(0, MINUTES_PER_DAY, step)) + [MINUTES_PER_DAY - 1]
+    starts = [0]
+    try:
+        for first, last in zip(samples, samples[1:]):
+            starts += change_points(first, last)
+    except swe.Error as e:
+        # Placidus houses are undefined inside the polar circles
+        raise ValueError(f"Error calculating birth time ranges: {e}")
+    ends = [start - 1 for start in starts[1:]] + [MINUTES_PER_DAY - 1]
+
+    segments = []
+    for start, end in zip(starts, ends):
+        values = dict(zip(ASTROLOGY_FIELDS + HUMAN_DESIGN_FIELDS, outcome(start)))
+        for field in ("sun_house", "ascendant_house"):
+            values[field] = get_house_info(values[field])[0]
+        segments.append({"start": _minute_label(start), "end": _minute_label(end), **values})
+
+    return {
+        "dob": dob,
+        "timezone": timezone_name,
+        "segments": segments,
+        "astrology": {field: _ranges_by_value(segments, field) for field in ASTROLOGY_FIELDS},
+        "human_design": {field: _ranges_by_value(segments, field) for field in HUMAN_DESIGN_FIELDS},
+    }
+
+def _ranges_by_value(segments, field):
+    """Merge consecutive segments sharing a field's value into [{"value", "ranges"}]."""
+    values = {}
+    previous = None
+    for segment in segments:
+        ranges = values.setdefault(segment[field], [])
+        if segment[field] == previous:
+            ranges[-1]["end"] = segment["end"]
+        else:
+            ranges.append({"start": segment["start"], "end": segment["end"]})
+        previous = segment[field]
+    return [{"value": value, "ranges": ranges} for value, ranges in values.items()]
\ No newline at end of file
@@ -0,0 +1,363 @@
+import csv
+import io
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, as_completed, wait
+from itertools import islice
+
+import click
+from flask import current_app
+from flask.cli import AppGroup
+
+from app.astrology import calculate_astrology_details, get_timezone_from_coordinates
+from app.chart_record import encode_chart, error_record, file_header
+from app.ephemeris import configure_ephemeris, resolve_tier
+from app.human_design import calculate_human_design
+from app.human_design_table import get_human_design_table, lookup_human_design
+
+charts_cli = AppGroup("charts", help="Bulk chart computation.")
+
+INPUT_FIELDS = ["id", "dob", "hour", "latitude", "longitude"]
+OUTPUT_FIELDS = INPUT_FIELDS + [
+    # Astrology fields
+    "sun_sign", "sun_position_dms", "rising_sign", "ascendant_position_dms",
+    "ruling_planet", "element", "sun_house_title", "sun_house_degree",
+    "ascendant_house_title", "ascendant_house_degree",
+    # Human Design fields
+    "type", "strategy", "not_self_theme", "signature", "definition",
+    "authority", "profile", "incarnation_cross",
+    "error",
+]
+
+def _detect_format(path, explicit):
+    if explicit:
+        return explicit
+    if path.lower().endswith(".charts"):
+        return "binary"
+    return "csv" if path.lower().endswith(".csv") else "ndjson"
+
+def read_records(path, input_format):
+    """
+    Stream birth records from a CSV or NDJSON file, one dict at a time.
+
+    An NDJSON line that is not valid JSON or not an object is yielded as a
+    record holding only an "error", so it becomes an error row instead of
+    stopping the job.
+
+    Args:
+        path (str): Input file path.
+        input_format (str): "csv" or "ndjson".
+
+    Yields:
+        dict: One birth record.
+    """
+    with open(path, "r", encoding="utf-8", newline="") as file:
+        if input_format == "csv":
+            yield from csv.DictReader(file)
+        else:
+            for line_number, line in enumerate(file, 1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError as e:
+                    yield {"error": f"Line {line_number}: invalid JSON ({e})"}
+                    continue
+                if not isinstance(record, dict):
+                    yield {"error": f"Line {line_number}: expected a JSON object, got {type(record).__name__}"}
+                    continue
+                yield record
+
+def read_chunks(records, chunk_size):
+    """Group a record stream into numbered chunks: yields (chunk_index, [records])."""
+    index = 0
+    while True:
+        chunk = list(islice(records, chunk_size))
+        if not chunk:
+            return
+        yield index, chunk
+        index += 1
+
+# Human Design table opened by each pool worker (see `_init_worker`), or None
+_human_design_table = None
+
+def _human_design_fields(dob, hour, latitude, longitude, tier):
+    # The text fields come from the precomputed table when it covers the birth,
+    # with no ephemeris calls; otherwise they are calculated
+    if _human_design_table is not None:
+        try:
+            return lookup_human_design(_human_design_table, dob, hour, get_timezone_from_coordinates(latitude, longitude))
+        except ValueError:
+            pass  # Outside the table's range, or an invalid date the calculation reports
+    return calculate_human_design(dob, hour, latitude, longitude, tier)
+
+def compute_chart(record, tier=None):
+    """
+    Compute the astrology and Human Design fields for one birth record.
+
+    Errors are reported in the "error" field so one bad record does not stop the job.
+    """
+    result = {field: record.get(field) for field in INPUT_FIELDS}
+    if record.get("error"):
+        # Unreadable input line (see `read_records`)
+        result["error"] = record["error"]
+        return result
+    try:
+        latitude = float(record["latitude"])
+        longitude = float(record["longitude"])
+        astrology_details = calculate_astrology_details(record["dob"], record["hour"], latitude, longitude, tier)
+        human_design_details = _human_design_fields(record["dob"], record["hour"], latitude, longitude, tier)
+    except (KeyError, TypeError, ValueError) as e:
+        result["error"] = str(e)
+        return result
+
+    result.update({
+        "sun_sign": astrology_details["sun_sign"],
+        "sun_position_dms": astrology_details["sun_position_dms"],
+        "rising_sign": astrology_details["rising_sign"],
+        "ascendant_position_dms": astrology_details["ascendant_position_dms"],
+        "ruling_planet": astrology_details["ruling_planet"],
+        "element": astrology_details["element"],
+        "sun_house_title": astrology_details["sun_house"]["title"],
+        "sun_house_degree": astrology_details["sun_house"]["degree"],
+        "ascendant_house_title": astrology_details["ascendant_house"]["title"],
+        "ascendant_house_degree": astrology_details["ascendant_house"]["degree"],
+        "type": human_design_details["Type"],
+        "strategy": human_design_details["Strategy"],
+        "not_self_theme": human_design_details["Not-Self Theme"],
+        "signature": human_design_details["Signature"],
+        "definition": human_design_details["Definition"],
+        "authority": human_design_details["Authority"],
+        "profile": human_design_details["Profile"],
+        "incarnation_cross": human_design_details["Incarnation Cross"],
+    })
+    return result
+
+def compute_chart_record(record, tier=None, row=0):
+    """
+    Compute one birth record as a binary chart record (see app.chart_record).
+
+    The record id is the input row number; failed records are flagged rather than dropped.
+    """
+    if record.get("error"):
+        return error_record(record_id=row)
+    try:
+        latitude = float(record["latitude"])
+        longitude = float(record["longitude"])
+        astrology_details = calculate_astrology_details(record["dob"], record["hour"], latitude, longitude, tier)
+        human_design_details = calculate_human_design(record["dob"], record["hour"], latitude, longitude, tier)
+    except (KeyError, TypeError, ValueError):
+        return error_record(record_id=row)
+    return encode_chart(astrology_details, human_design_details, latitude, longitude, row, tier)
+
+def compute_chunk(records, tier, output_format="ndjson", first_row=0):
+    """Compute a chunk of records inside a pool worker."""
+    if output_format == "binary":
+        return [compute_chart_record(record, tier, first_row + offset) for offset, record in enumerate(records)]
+    return [compute_chart(record, tier) for record in records]
+
+def _init_worker(ephemeris_path, tier, human_design_table_path=None):
+    global _human_design_table
+    # The calculation functions print debug output for every chart
+    sys.stdout = open(os.devnull, "w")
+    configure_ephemeris(ephemeris_path, tier)
+    if human_design_table_path:
+        _human_design_table = get_human_design_table(human_design_table_path)
+
+def encode_rows(rows, output_format):
+    """Serialize computed rows to bytes in the output format."""
+    if output_format == "binary":
+        return b"".join(row.tobytes() for row in rows)
+    if output_format == "ndjson":
+        return "".join(json.dumps(row, ensure_ascii=False) + "\n" for row in rows).encode("utf-8")
+    buffer = io.StringIO()
+    csv.DictWriter(buffer, fieldnames=OUTPUT_FIELDS, extrasaction="ignore").writerows(rows)
+    return buffer.getvalue().encode("utf-8")
+
+class Checkpoint:
+    """
+    Progress of a bulk job, saved next to the output file.
+
+    Chunks below `done_below` are all written; `done` holds chunks finished
+    out of order above it. `output_bytes` is the output size matching that
+    state, so a resumed job can drop anything written after the last save.
+    `params` are the job settings the chunk numbers depend on; a checkpoint
+    saved with other settings cannot be resumed.
+    """
+
+    def __init__(self, path, params=None):
+        self.path = path
+        self.params = params or {}
+        self.done_below = 0
+        self.done = set()
+        self.output_bytes = 0
+        self.records = 0
+
+    def load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as file:
+                state = json.load(file)
+        except FileNotFoundError:
+            return False
+        saved_params = state.get("params", {})
+        if saved_params != self.params:
+            changed = sorted(name for name in set(saved_params) | set(self.params) if saved_params.get(name) != self.params.get(name))
+            raise ValueError(f"checkpoint {self.path} was saved with different {', '.join(changed)}")
+        self.done_below = state["done_below"]
+        self.done = set(state["done"])
+        self.output_bytes = state["output_bytes"]
+        self.records = state["records"]
+        return True
+
+    def is_done(self, chunk_index):
+        return chunk_index < self.done_below or chunk_index in self.done
+
+    def mark_done(self, chunk_index, records, output_bytes):
+        self.done.add(chunk_index)
+        while self.done_below in self.done:
+            self.done.remove(self.done_below)
+            self.done_below += 1
+        self.records += records
+        self.output_bytes = output_bytes
+        self.save()
+
+    def save(self):
+        state = {
+            "params": self.params,
+            "done_below": self.done_below,
+            "done": sorted(self.done),
+            "output_bytes": self.output_bytes,
+            "records": self.records,
+        }
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            json.dump(state, file)
+        os.replace(tmp_path, self.path)
+
+    def remove(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+@charts_cli.command("bulk")
+@click.argument("input_path", type=click.Path(exists=True, dir_okay=False))
+@click.argument("output_path", type=click.Path(dir_okay=False))
+@click.option("--input-format", type=click.Choice(["csv", "ndjson"]), help="Defaults to the input file extension.")
+@click.option("--output-format", type=click.Choice(["csv", "ndjson", "binary"]), help="Defaults to the output file extension (.charts for binary).")
+@click.option("--workers", type=int, default=os.cpu_count(), show_default=True, help="Worker processes.")
+@click.option("--chunk-size", type=int, default=500, show_default=True, help="Records per work unit.")
+@click.option("--unordered", is_flag=True, help="Write chunks as they finish instead of in input order.")
+@click.option("--tier", type=click.Choice(["fast", "precise"]), help="Ephemeris precision tier.")
+@click.option("--restart", is_flag=True, help="Ignore an existing checkpoint and start over.")
+@click.option("--progress-every", type=float, default=5.0, show_default=True, help="Seconds between progress reports.")
+def bulk(input_path, output_path, input_format, output_format, workers, chunk_size, unordered, tier, restart, progress_every):
+    """
+    Compute charts for every birth record in INPUT_PATH and write them to OUTPUT_PATH.
+
+    Input records need dob (YYYY-MM-DD), hour (HH:MM), latitude and
+    longitude, plus an optional id. Binary output holds fixed-size chart
+    records (see app.chart_record) with the input row number as their id.
+    CSV and NDJSON output take the Human Design fields from the table built
+    by `flask human-design build-table` when it exists and covers the birth.
+    The input is read and the output written
+    in chunks with a bounded number in flight, so memory stays flat for any
+    file size. Progress is checkpointed after every chunk; rerunning the same
+    command resumes where an interrupted run stopped (a rerun with a different
+    input, format, chunk size or tier is refused).
+    """
+    input_format = _detect_format(input_path, input_format)
+    output_format = _detect_format(output_path, output_format)
+    tier = resolve_tier(tier)
+
+    # Binary records need the planetary positions, which the table does not hold
+    human_design_table_path = current_app.config["HUMAN_DESIGN_TABLE_PATH"]
+    if output_format == "binary" or not os.path.exists(human_design_table_path):
+        human_design_table_path = None
+    else:
+        click.echo(f"Human Design fields from {human_design_table_path}", err=True)
+
+    checkpoint = Checkpoint(f"{output_path}.checkpoint", {
+        "input_path": os.path.abspath(input_path),
+        "input_format": input_format,
+        "output_format": output_format,
+        "chunk_size": chunk_size,
+        "tier": tier,
+    })
+    if restart:
+        checkpoint.remove()
+    try:
+        resuming = checkpoint.load()
+    except ValueError as e:
+        raise click.ClickException(f"{e}; rerun with the same options or use --restart to start over")
+    if resuming:
+        click.echo(f"Resuming after {checkpoint.records} records", err=True)
+    elif os.path.exists(output_path) and not restart:
+        raise click.ClickException(f"{output_path} exists without a checkpoint; use --restart to overwrite it")
+
+    output = open(output_path, "r+b" if resuming else "wb")
+    # Drop anything written after the last checkpoint (e.g. a half-written chunk)
+    output.truncate(checkpoint.output_bytes)
+    output.seek(checkpoint.output_bytes)
+    if output_format in ("csv", "binary") and checkpoint.output_bytes == 0:
+        if output_format == "binary":
+            output.write(file_header())
+        else:
+            header = io.StringIO()
+            csv.DictWriter(header, fieldnames=OUTPUT_FIELDS).writeheader()
+            output.write(header.getvalue().encode("utf-8"))
+        output.flush()
+        checkpoint.output_bytes = output.tell()
+    checkpoint.save()
+
+    started = time.perf_counter()
+    last_report = started
+    processed = 0
+
+    def write_chunk(chunk_index, rows):
+        nonlocal processed, last_report
+        output.write(encode_rows(rows, output_format))
+        output.flush()
+        os.fsync(output.fileno())
+        checkpoint.mark_done(chunk_index, len(rows), output.tell())
+
+        processed += len(rows)
+        now = time.perf_counter()
+        if now - last_report >= progress_every:
+            last_report = now
+            rate = processed / (now - started)
+            click.echo(f"{checkpoint.records} records written ({rate:.0f} records/s)", err=True)
+
+    chunks = read_chunks(read_records(input_path, input_format), chunk_size)
+    max_pending = workers * 2
+    pending = {}  # future -> chunk index, in submission order
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(current_app.config["EPHEMERIS_PATH"], tier, human_design_table_path),
+    ) as executor:
+        for chunk_index, records in chunks:
+            if checkpoint.is_done(chunk_index):
+                continue
+            future = executor.submit(compute_chunk, records, tier, output_format, chunk_index * chunk_size)
+            pending[future] = chunk_index
+
+            while len(pending) >= max_pending:
+                if unordered:
+                    finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                else:
+                    finished = [next(iter(pending))]
+                for future in finished:
+                    write_chunk(pending.pop(future), future.result())
+
+        for future in as_completed(list(pending)) if unordered else list(pending):
+            write_chunk(pending.pop(future), future.result())
+
+    output.close()
+    checkpoint.remove()
+    elapsed = time.perf_counter() - started
+    click.echo(
+        f"Done: {processed} records in {elapsed:.1f}s ({processed / elapsed if elapsed else 0:.0f} records/s)",
+        err=True,
+    )
\ No newline at end of file
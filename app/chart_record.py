@@ -0,0 +1,246 @@
+import struct
+
+import numpy as np
+
+from app.astrology import RULING_PLANETS, ZODIAC_SIGNS, convert_to_dms, determine_house, get_element, get_house_info
+from app.ephemeris import TIER_FAST
+from app.human_design import (
+    INCARNATION_CROSSES,
+    PLANETS,
+    determine_not_self_theme,
+    determine_signature,
+    determine_strategy,
+    get_human_design_gate,
+)
+
+RECORD_VERSION = 1
+
+# Column order of the "longitudes" and "gates" arrays
+BODIES = PLANETS + ["EARTH"]
+
+# Enum code tables: code 0 is "unknown", code i is the (i-1)th name
+TYPES = ["Generator", "Manifestor", "Projector", "Reflector"]
+AUTHORITIES = [
+    "Emotional Solar Plexus", "Sacral", "Splenic", "Ego Manifested", "Ego Projected",
+    "Self-Projected", "Mental (Environmental)", "Lunar Cycle", "None (Outer Authority)",
+]
+DEFINITIONS = ["Single", "Split", "Triple Split", "Quadruple Split", "Undefined"]
+CROSSES = list(INCARNATION_CROSSES.values())  # Code 0: custom cross, named from the Sun/Earth gates
+
+# Record flags
+FLAG_ERROR = 1  # The chart could not be computed; only id, latitude and longitude are set
+FLAG_FAST_TIER = 2  # Computed with the fast (Moshier) ephemeris
+
+# Version 1 layout (168 bytes, little-endian, 8-byte aligned). The Sun and
+# Ascendant are float64 and the house degrees fixed point (1/100°) because
+# they are displayed; float32 elsewhere is accurate to about 0.1".
+CHART_DTYPE = np.dtype({
+    "names": [
+        "version", "flags", "sun_sign", "rising_sign", "sun_house", "ascendant_house",
+        "type", "authority", "profile", "definition", "cross", "gates",
+        "sun_house_degree", "ascendant_house_degree",
+        "id", "julian_day", "ascendant", "sun_longitude", "latitude", "longitude",
+        "longitudes", "house_cusps",
+    ],
+    "formats": [
+        "u1", "u1", "u1", "u1", "u1", "u1",
+        "u1", "u1", "u1", "u1", "u1", ("u1", (len(BODIES),)),
+        "<u2", "<u2",
+        "<u8", "<f8", "<f8", "<f8", "<f4", "<f4",
+        ("<f4", (len(BODIES),)), ("<f4", (12,)),
+    ],
+    "offsets": [0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 22, 24, 32, 40, 48, 56, 64, 68, 72, 116],
+    "itemsize": 168,
+})
+
+# File header: magic, record version, record size
+FILE_HEADER = struct.Struct("<4sHH")
+FILE_MAGIC = b"CHRT"
+
+def enum_code(names, name):
+    """Code of `name` in an enum table (0 if it is not listed)."""
+    try:
+        return names.index(name) + 1
+    except ValueError:
+        return 0
+
+def enum_name(names, code):
+    """Name for an enum code ("Unknown" for 0 or an unlisted code)."""
+    return names[code - 1] if 0 < code <= len(names) else "Unknown"
+
+def encode_chart(astrology_details, human_design_details, latitude, longitude, record_id=0, tier=None):
+    """
+    Pack a computed chart into one binary record.
+
+    Args:
+        astrology_details (dict): Result of `calculate_astrology_details`.
+        human_design_details (dict): Result of `calculate_human_design`.
+        latitude (float): Latitude of birth location.
+        longitude (float): Longitude of birth location.
+        record_id (int): Caller-defined identifier (e.g., a user or row ID).
+        tier (str): Ephemeris tier the chart was computed with.
+
+    Returns:
+        numpy.void: A record of CHART_DTYPE.
+    """
+    record = np.zeros((), dtype=CHART_DTYPE)
+    positions = human_design_details["Planetary Positions"]
+    house_cusps = list(astrology_details["houses"].values())
+    sun_degree = astrology_details["sun_degree"]
+    ascendant_degree = astrology_details["ascendant_degree"]
+    sun_line, earth_line = (int(line) for line in human_design_details["Profile"].split("/"))
+
+    record["version"] = RECORD_VERSION
+    record["flags"] = FLAG_FAST_TIER if tier == TIER_FAST else 0
+    record["sun_sign"] = enum_code(ZODIAC_SIGNS, astrology_details["sun_sign"])
+    record["rising_sign"] = enum_code(ZODIAC_SIGNS, astrology_details["rising_sign"])
+    record["sun_house"] = determine_house(sun_degree, house_cusps)[0]
+    record["ascendant_house"] = determine_house(ascendant_degree, house_cusps)[0]
+    record["sun_house_degree"] = round(astrology_details["sun_house"]["degree"] * 100)
+    record["ascendant_house_degree"] = round(astrology_details["ascendant_house"]["degree"] * 100)
+    record["type"] = enum_code(TYPES, human_design_details["Type"])
+    record["authority"] = enum_code(AUTHORITIES, human_design_details["Authority"])
+    record["profile"] = (sun_line - 1) * 6 + earth_line
+    record["definition"] = enum_code(DEFINITIONS, human_design_details["Definition"])
+    record["cross"] = enum_code(CROSSES, human_design_details["Incarnation Cross"])
+    # Gates are stored exactly; float32 longitudes could round across a gate boundary
+    record["gates"] = [get_human_design_gate(positions[body]) for body in BODIES]
+    record["id"] = record_id
+    record["julian_day"] = human_design_details["Julian Day"]
+    record["latitude"] = latitude
+    record["longitude"] = longitude
+    record["ascendant"] = ascendant_degree
+    record["sun_longitude"] = sun_degree
+    record["longitudes"] = [positions[body] for body in BODIES]
+    record["house_cusps"] = house_cusps
+    return record[()]
+
+def error_record(latitude=0.0, longitude=0.0, record_id=0):
+    """A record flagged as failed, so row positions stay aligned with the input."""
+    record = np.zeros((), dtype=CHART_DTYPE)
+    record["version"] = RECORD_VERSION
+    record["flags"] = FLAG_ERROR
+    record["id"] = record_id
+    record["latitude"] = latitude
+    record["longitude"] = longitude
+    return record[()]
+
+def decode_chart(record):
+    """
+    Unpack one record into the same fields the results page and bulk output use.
+
+    Args:
+        record (numpy.void): A record of CHART_DTYPE.
+
+    Returns:
+        dict: Astrology and Human Design fields plus "planet_positions".
+
+    Raises:
+        ValueError: If the record has an unsupported version or is flagged as failed.
+    """
+    if record["version"] != RECORD_VERSION:
+        raise ValueError(f"Unsupported chart record version: {record['version']}")
+    if record["flags"] & FLAG_ERROR:
+        raise ValueError(f"Chart record {record['id']} holds a failed calculation")
+
+    sun_degree = float(record["sun_longitude"])
+    ascendant_degree = float(record["ascendant"])
+    sun_house_title, sun_house_description = get_house_info(int(record["sun_house"]))
+    ascendant_house_title, ascendant_house_description = get_house_info(int(record["ascendant_house"]))
+    sun_sign = enum_name(ZODIAC_SIGNS, record["sun_sign"])
+    type_ = enum_name(TYPES, record["type"])
+    profile = int(record["profile"]) - 1
+
+    cross = enum_name(CROSSES, record["cross"])
+    if record["cross"] == 0:
+        gates = dict(zip(BODIES, record["gates"].tolist()))
+        cross = f"Custom Cross (Sun Gate: {gates['SUN'] - 1}, Earth Gate: {gates['EARTH'] - 1})"
+
+    return {
+        "latitude": float(record["latitude"]),
+        "longitude": float(record["longitude"]),
+        # Astrology fields
+        "sun_sign": sun_sign,
+        "sun_position_dms": convert_to_dms(sun_degree),
+        "rising_sign": enum_name(ZODIAC_SIGNS, record["rising_sign"]),
+        "ascendant_position_dms": convert_to_dms(ascendant_degree),
+        "ruling_planet": RULING_PLANETS.get(sun_sign, "Unknown"),
+        "element": get_element(sun_sign),
+        "sun_house_title": sun_house_title,
+        "sun_house_description": sun_house_description,
+        "sun_house_degree": int(record["sun_house_degree"]) / 100,
+        "ascendant_house_title": ascendant_house_title,
+        "ascendant_house_description": ascendant_house_description,
+        "ascendant_house_degree": int(record["ascendant_house_degree"]) / 100,
+        # Human Design fields
+        "type": type_,
+        "strategy": determine_strategy(type_),
+        "not_self_theme": determine_not_self_theme(type_),
+        "signature": determine_signature(type_),
+        "definition": enum_name(DEFINITIONS, record["definition"]),
+        "authority": enum_name(AUTHORITIES, record["authority"]),
+        "profile": f"{profile // 6 + 1}/{profile % 6 + 1}",
+        "incarnation_cross": cross,
+        "planet_positions": dict(zip(BODIES, record["longitudes"].tolist())),
+    }
+
+def labels(records, field):
+    """
+    Enum names for a whole column at once (e.g., labels(records, "type")).
+
+    Args:
+        records (numpy.ndarray): Array of CHART_DTYPE records.
+        field (str): "sun_sign", "rising_sign", "type", "authority", "definition" or "cross".
+
+    Returns:
+        numpy.ndarray: Names, "Unknown" for code 0 (custom crosses for "cross").
+    """
+    names = {
+        "sun_sign": ZODIAC_SIGNS, "rising_sign": ZODIAC_SIGNS, "type": TYPES,
+        "authority": AUTHORITIES, "definition": DEFINITIONS, "cross": CROSSES,
+    }[field]
+    return np.array(["Unknown"] + names)[records[field]]
+
+def file_header():
+    """Header bytes that start a chart record file."""
+    return FILE_HEADER.pack(FILE_MAGIC, RECORD_VERSION, CHART_DTYPE.itemsize)
+
+def _check_header(header):
+    magic, version, itemsize = FILE_HEADER.unpack(header[:FILE_HEADER.size])
+    if magic != FILE_MAGIC:
+        raise ValueError("Not a chart record file")
+    if version != RECORD_VERSION or itemsize != CHART_DTYPE.itemsize:
+        raise ValueError(f"Unsupported chart record version {version} ({itemsize}-byte records)")
+
+def records_from_bytes(buffer):
+    """
+    View a chart record file held in memory as a record array, without copying.
+
+    Args:
+        buffer (bytes-like): File contents, header included.
+
+    Returns:
+        numpy.ndarray: Read-only array of CHART_DTYPE records backed by `buffer`.
+    """
+    _check_header(bytes(buffer[:FILE_HEADER.size]))
+    return np.frombuffer(buffer, dtype=CHART_DTYPE, offset=FILE_HEADER.size)
+
+def open_records(path):
+    """
+    Memory-map a chart record file; records are paged in only when read.
+
+    Args:
+        path (str): Path to a file written with `write_records` (or `flask charts bulk`).
+
+    Returns:
+        numpy.ndarray: Read-only memmap of CHART_DTYPE records.
+    """
+    with open(path, "rb") as file:
+        _check_header(file.read(FILE_HEADER.size))
+    return np.memmap(path, dtype=CHART_DTYPE, mode="r", offset=FILE_HEADER.size)
+
+def write_records(path, records):
+    """Write an array (or list) of CHART_DTYPE records to a chart record file."""
+    with open(path, "wb") as file:
+        file.write(file_header())
+        file.write(np.asarray(records, dtype=CHART_DTYPE).tobytes())
\ No newline at end of file
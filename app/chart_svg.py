@@ -0,0 +1,349 @@
+import hashlib
+import json
+import math
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+
+from app.astrology import ZODIAC_SIGNS
+from app.human_design import CENTER_GATES, get_human_design_gate
+
+# Bump when the drawing changes so cached SVGs are not reused
+RENDER_VERSION = 1
+
+BACKGROUND = "#0C1223"
+RING = "#152143"
+LINE = "#475058"
+TEXT = "#f5f5f5"
+ACCENT = "#E0B860"
+
+PLANET_LABELS = {
+    "SUN": "Su", "MOON": "Mo", "MERCURY": "Me", "VENUS": "Ve", "MARS": "Ma",
+    "JUPITER": "Ju", "SATURN": "Sa", "URANUS": "Ur", "NEPTUNE": "Ne", "PLUTO": "Pl", "EARTH": "Ea",
+}
+
+# ? NATAL WHEEL
+WHEEL_SIZE = 600
+WHEEL_CENTER = WHEEL_SIZE / 2
+ZODIAC_OUTER = 290
+ZODIAC_INNER = 250
+HOUSE_INNER = 90
+PLANET_RADIUS = 215
+
+def _point(radius, longitude):
+    """Screen point for an ecliptic longitude, 0° Aries on the right, counter-clockwise."""
+    angle = math.radians(longitude)
+    return WHEEL_CENTER + radius * math.cos(angle), WHEEL_CENTER - radius * math.sin(angle)
+
+@lru_cache(maxsize=None)
+def zodiac_ring_layer():
+    """Static zodiac ring (signs, dividers and degree ticks), built once."""
+    parts = [
+        f'<circle cx="{WHEEL_CENTER}" cy="{WHEEL_CENTER}" r="{ZODIAC_OUTER}" fill="{RING}" stroke="{LINE}"/>',
+        f'<circle cx="{WHEEL_CENTER}" cy="{WHEEL_CENTER}" r="{ZODIAC_INNER}" fill="{BACKGROUND}" stroke="{LINE}"/>',
+        f'<circle cx="{WHEEL_CENTER}" cy="{WHEEL_CENTER}" r="{HOUSE_INNER}" fill="none" stroke="{LINE}"/>',
+    ]
+    for degree in range(0, 360, 5):
+        if degree % 30 == 0:
+            outer = ZODIAC_OUTER  # Sign divider
+        else:
+            outer = ZODIAC_INNER + (8 if degree % 10 == 0 else 4)
+        x1, y1 = _point(ZODIAC_INNER, degree)
+        x2, y2 = _point(outer, degree)
+        parts.append(f'<line x1="{x1:.1f}" y1="{y1:.1f}" x2="{x2:.1f}" y2="{y2:.1f}" stroke="{LINE}"/>')
+    for index, sign in enumerate(ZODIAC_SIGNS):
+        x, y = _point((ZODIAC_OUTER + ZODIAC_INNER) / 2, index * 30 + 15)
+        parts.append(
+            f'<text x="{x:.1f}" y="{y:.1f}" fill="{TEXT}" font-size="13" text-anchor="middle" '
+            f'dominant-baseline="central">{sign[:3]}</text>'
+        )
+    return "".join(parts)
+
+def render_wheel(house_cusps, ascendant_degree, planetary_positions):
+    """
+    Render the natal wheel as SVG.
+
+    The chart is drawn in ecliptic coordinates and rotated as a whole so the
+    Ascendant sits on the left; only the houses and planets are drawn per chart.
+
+    Args:
+        house_cusps (list): The 12 house cusp longitudes.
+        ascendant_degree (float): Ascendant longitude.
+        planetary_positions (dict): Planetary positions (degrees) keyed by planet.
+
+    Returns:
+        str: SVG document.
+    """
+    rotation = ascendant_degree - 180  # SVG rotates clockwise, longitudes run counter-clockwise
+
+    data = []
+    for index, cusp in enumerate(house_cusps):
+        x1, y1 = _point(HOUSE_INNER, cusp)
+        x2, y2 = _point(ZODIAC_INNER, cusp)
+        width = 2 if index % 3 == 0 else 1  # Angular houses (1, 4, 7, 10)
+        data.append(f'<line x1="{x1:.1f}" y1="{y1:.1f}" x2="{x2:.1f}" y2="{y2:.1f}" stroke="{TEXT}" stroke-width="{width}"/>')
+
+        next_cusp = house_cusps[(index + 1) % 12]
+        middle = cusp + ((next_cusp - cusp) % 360) / 2
+        x, y = _point(HOUSE_INNER + 14, middle)
+        data.append(
+            f'<text x="{x:.1f}" y="{y:.1f}" fill="{LINE}" font-size="11" text-anchor="middle" '
+            f'dominant-baseline="central" transform="rotate({-rotation:.2f} {x:.1f} {y:.1f})">{index + 1}</text>'
+        )
+
+    for planet, longitude in planetary_positions.items():
+        if planet not in PLANET_LABELS:
+            continue
+        x1, y1 = _point(ZODIAC_INNER, longitude)
+        x2, y2 = _point(ZODIAC_INNER - 10, longitude)
+        x, y = _point(PLANET_RADIUS, longitude)
+        data.append(f'<line x1="{x1:.1f}" y1="{y1:.1f}" x2="{x2:.1f}" y2="{y2:.1f}" stroke="{ACCENT}" stroke-width="2"/>')
+        data.append(
+            f'<text x="{x:.1f}" y="{y:.1f}" fill="{ACCENT}" font-size="14" text-anchor="middle" '
+            f'dominant-baseline="central" transform="rotate({-rotation:.2f} {x:.1f} {y:.1f})">{PLANET_LABELS[planet]}</text>'
+        )
+
+    x1, y1 = _point(HOUSE_INNER, ascendant_degree)
+    x2, y2 = _point(ZODIAC_OUTER, ascendant_degree)
+    data.append(f'<line x1="{x1:.1f}" y1="{y1:.1f}" x2="{x2:.1f}" y2="{y2:.1f}" stroke="{ACCENT}" stroke-width="3"/>')
+
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {WHEEL_SIZE} {WHEEL_SIZE}" font-family="Helvetica, Arial, sans-serif">'
+        f'<g transform="rotate({rotation:.2f} {WHEEL_CENTER} {WHEEL_CENTER})">'
+        f'{zodiac_ring_layer()}{"".join(data)}</g></svg>'
+    )
+
+# ? BODYGRAPH
+BODYGRAPH_WIDTH = 400
+BODYGRAPH_HEIGHT = 600
+GATE_SPACING = 20
+
+# Center: (shape, x, y, size)
+CENTER_LAYOUT = {
+    "Head": ("triangle-up", 200, 60, 80),
+    "Ajna": ("triangle-down", 200, 150, 80),
+    "Throat": ("square", 200, 245, 90),
+    "G": ("diamond", 200, 345, 100),
+    "Heart": ("triangle-up", 295, 380, 60),
+    "Spleen": ("triangle-right", 70, 450, 90),
+    "Solar Plexus": ("triangle-left", 330, 450, 90),
+    "Sacral": ("square", 200, 455, 80),
+    "Root": ("square", 200, 555, 80),
+}
+
+def _center_points(shape, x, y, size):
+    half = size / 2
+    shapes = {
+        "triangle-up": [(x, y - half), (x + half, y + half), (x - half, y + half)],
+        "triangle-down": [(x - half, y - half), (x + half, y - half), (x, y + half)],
+        "triangle-left": [(x - half, y), (x + half, y - half), (x + half, y + half)],
+        "triangle-right": [(x + half, y), (x - half, y - half), (x - half, y + half)],
+        "diamond": [(x, y - half), (x + half, y), (x, y + half), (x - half, y)],
+        "square": [(x - half, y - half), (x + half, y - half), (x + half, y + half), (x - half, y + half)],
+    }
+    return " ".join(f"{px:.1f},{py:.1f}" for px, py in shapes[shape])
+
+@lru_cache(maxsize=None)
+def gate_label_positions():
+    """Position of every gate label, laid out in rows of four inside its center."""
+    positions = {}
+    for center, gates in CENTER_GATES.items():
+        _, x, y, _ = CENTER_LAYOUT[center]
+        rows = [gates[i:i + 4] for i in range(0, len(gates), 4)]
+        top = y - (len(rows) - 1) * GATE_SPACING / 2
+        for row_index, row in enumerate(rows):
+            left = x - (len(row) - 1) * GATE_SPACING / 2
+            for column, gate in enumerate(row):
+                positions[gate] = (left + column * GATE_SPACING, top + row_index * GATE_SPACING)
+    return positions
+
+@lru_cache(maxsize=None)
+def bodygraph_static_layers():
+    """Static center outlines and gate labels, built once: (shapes, labels)."""
+    shapes = "".join(
+        f'<polygon points="{_center_points(*layout)}" fill="{RING}" stroke="{LINE}"/>'
+        for layout in CENTER_LAYOUT.values()
+    )
+    labels = "".join(
+        f'<text x="{x:.1f}" y="{y:.1f}" fill="{TEXT}" font-size="9" text-anchor="middle" '
+        f'dominant-baseline="central">{gate}</text>'
+        for gate, (x, y) in gate_label_positions().items()
+    )
+    return shapes, labels
+
+def render_bodygraph(planetary_positions):
+    """
+    Render the Human Design bodygraph as SVG.
+
+    Centers holding an activated gate are filled and activated gates are
+    marked; the center outlines and gate labels are static layers.
+
+    Args:
+        planetary_positions (dict): Planetary positions (degrees) keyed by planet.
+
+    Returns:
+        str: SVG document.
+    """
+    active_gates = {get_human_design_gate(degree) for degree in planetary_positions.values()}
+    shapes, labels = bodygraph_static_layers()
+    positions = gate_label_positions()
+
+    data = []
+    for center, gates in CENTER_GATES.items():
+        if active_gates.intersection(gates):
+            data.append(f'<polygon points="{_center_points(*CENTER_LAYOUT[center])}" fill="{ACCENT}" fill-opacity="0.35" stroke="{ACCENT}"/>')
+    for gate in sorted(active_gates):
+        if gate in positions:
+            x, y = positions[gate]
+            data.append(f'<circle cx="{x:.1f}" cy="{y:.1f}" r="8" fill="{ACCENT}"/>')
+
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {BODYGRAPH_WIDTH} {BODYGRAPH_HEIGHT}" font-family="Helvetica, Arial, sans-serif">'
+        f'{shapes}{"".join(data)}{labels}</svg>'
+    )
+
+# ? RENDER CACHE
+RENDERERS = {
+    "wheel": lambda data: render_wheel(data["house_cusps"], data["ascendant_degree"], data["planetary_positions"]),
+    "bodygraph": lambda data: render_bodygraph(data["planetary_positions"]),
+}
+
+class SvgRenderCache:
+    """
+    Rendered SVGs keyed by a hash of their inputs, in memory and on disk.
+
+    The same inputs always give the same key, so a key's content never
+    changes and can be served with immutable cache headers. Files not
+    rendered or read from disk for `max_age` seconds are deleted by a sweep
+    that runs at most every `sweep_interval` seconds.
+    """
+
+    def __init__(self, directory, max_age=31 * 86400, max_entries=512, sweep_interval=3600):
+        self.directory = directory
+        self.max_age = max_age
+        self.max_entries = max_entries
+        self.sweep_interval = sweep_interval
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._next_sweep = 0
+
+    @staticmethod
+    def content_key(kind, data):
+        payload = json.dumps([RENDER_VERSION, kind, data], sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.svg")
+
+    def _remember(self, key, svg):
+        with self._lock:
+            self._memory[key] = svg
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    def _touch(self, key):
+        # Keeps a file in use from being swept
+        try:
+            os.utime(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def _sweep(self):
+        # Delete files older than max_age; cheap enough to run from render()
+        now = time.time()
+        with self._lock:
+            if now < self._next_sweep:
+                return
+            self._next_sweep = now + self.sweep_interval
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return
+        for name in names:
+            path = os.path.join(self.directory, name)
+            try:
+                if now - os.path.getmtime(path) > self.max_age:
+                    os.remove(path)
+            except FileNotFoundError:
+                pass  # Swept by another process
+
+    def get(self, key):
+        """Return a cached SVG by key, or None."""
+        with self._lock:
+            svg = self._memory.get(key)
+            if svg is not None:
+                self._memory.move_to_end(key)
+                return svg
+        try:
+            with open(self._path(key), "r", encoding="utf-8") as file:
+                svg = file.read()
+        except FileNotFoundError:
+            return None
+        self._touch(key)
+        self._remember(key, svg)
+        return svg
+
+    def render(self, kind, data):
+        """
+        Render a chart unless it is already cached.
+
+        Args:
+            kind (str): "wheel" or "bodygraph".
+            data (dict): Renderer inputs (JSON-serializable).
+
+        Returns:
+            str: Content key of the SVG.
+        """
+        key = self.content_key(kind, data)
+        if self.get(key) is not None:
+            self._touch(key)
+            return key
+
+        svg = RENDERERS[kind](data)
+        self._remember(key, svg)
+        os.makedirs(self.directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as file:
+            file.write(svg)
+        os.replace(tmp_path, self._path(key))
+        self._sweep()
+        return key
+
+_caches = {}
+
+def get_render_cache(directory, max_age=31 * 86400):
+    """Return the shared render cache for a directory."""
+    if directory not in _caches:
+        _caches[directory] = SvgRenderCache(directory, max_age)
+    return _caches[directory]
+
+def render_chart_svgs(cache, astrology_details, human_design_details):
+    """
+    Render (or reuse) the natal wheel and bodygraph for a chart.
+
+    Inputs are rounded to 0.01° so equivalent charts share cache entries.
+
+    Args:
+        cache (SvgRenderCache): Cache to render into.
+        astrology_details (dict): Result of `calculate_astrology_details`.
+        human_design_details (dict): Result of `calculate_human_design`.
+
+    Returns:
+        dict: {"wheel": key, "bodygraph": key}
+    """
+    positions = {planet: round(degree, 2) for planet, degree in human_design_details["Planetary Positions"].items()}
+    # The same cusps as the house cards on the results page
+    house_cusps = astrology_details["houses"].values()
+    wheel = {
+        "house_cusps": [round(cusp, 2) for cusp in house_cusps],
+        "ascendant_degree": round(astrology_details["ascendant_degree"], 2),
+        "planetary_positions": positions,
+    }
+    return {
+        "wheel": cache.render("wheel", wheel),
+        "bodygraph": cache.render("bodygraph", {"planetary_positions": positions}),
+    }
\ No newline at end of file
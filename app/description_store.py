@@ -0,0 +1,257 @@
+import hashlib
+import json
+import os
+import random
+import tempfile
+import threading
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+from app.ai_description import MODEL_NAME, PROMPT_TEMPLATE, GENERATION_PARAMS
+from app.astrology import ZODIAC_SIGNS
+from config import Config
+
+@contextmanager
+def _file_lock(path):
+    """Hold an exclusive lock on `path` (created if missing) across processes."""
+    with open(path, "a+b") as file:
+        if fcntl is not None:
+            fcntl.flock(file.fileno(), fcntl.LOCK_EX)
+        else:
+            file.seek(0)
+            msvcrt.locking(file.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(file.fileno(), fcntl.LOCK_UN)
+            else:
+                file.seek(0)
+                msvcrt.locking(file.fileno(), msvcrt.LK_UNLCK, 1)
+
+def get_model_fingerprint(model_name=MODEL_NAME):
+    """
+    Identify the weights of a locally saved model.
+
+    Covers the config contents and the size and modification time of every
+    weight file, so retraining into the same directory changes it.
+
+    Returns:
+        list: [[file name, size, mtime_ns or config text], ...], or None for a
+            hub model name (its weights are fixed by the name).
+    """
+    if not os.path.isdir(model_name):
+        return None
+    fingerprint = []
+    for name in sorted(os.listdir(model_name)):
+        path = os.path.join(model_name, name)
+        if name == "config.json":
+            with open(path, "r", encoding="utf-8") as file:
+                fingerprint.append([name, file.read()])
+        elif name.endswith((".safetensors", ".bin")):
+            stat = os.stat(path)
+            fingerprint.append([name, stat.st_size, stat.st_mtime_ns])
+    return fingerprint
+
+def get_store_version(model_name=MODEL_NAME, prompt_template=PROMPT_TEMPLATE, params=GENERATION_PARAMS, quantized=False):
+    """
+    Build the version key for a store file.
+
+    Any change to the model (including retrained weights in a local model
+    directory), the prompt or the sampling parameters yields a new key, so
+    stale descriptions are never served for a new setup.
+
+    Returns:
+        str: Version key (e.g., "distilgpt2-3f2a9c1b7d" or "distilgpt2-int8-3f2a9c1b7d").
+    """
+    versioned = [prompt_template, params]
+    fingerprint = get_model_fingerprint(model_name)
+    if fingerprint is not None:
+        versioned.append(fingerprint)
+    digest = hashlib.sha1(
+        json.dumps(versioned, sort_keys=True).encode("utf-8")
+    ).hexdigest()[:10]
+    model_slug = os.path.basename(os.path.normpath(model_name))
+    if quantized:
+        model_slug += "-int8"
+    return f"{model_slug}-{digest}"
+
+class DescriptionStore:
+    """
+    On-disk store of generated descriptions for every Sun / Rising combination.
+
+    Each combination keeps a list of variants. Lookups pick a random variant;
+    misses are generated live once and written back to the store.
+
+    Several processes can share a store file (web workers and an offline
+    fill): writes re-read and merge the file under a lock, and reads reload
+    it whenever another process has changed it.
+    """
+
+    def __init__(self, directory=Config.DESCRIPTION_STORE_DIR, version=None, generator=None):
+        """
+        Args:
+            directory (str): Directory holding the versioned store files.
+            version (str): Store version key, defaults to the current model/prompt.
+            generator (callable): (sun_sign, rising_sign, count) -> list of descriptions.
+        """
+        self.directory = directory
+        self.version = version or get_store_version()
+        self.path = os.path.join(directory, f"{self.version}.json")
+        self._generator = generator
+        self._lock = threading.Lock()
+        self._stamp = None
+        self._descriptions = {}
+        self._refresh()
+
+    @staticmethod
+    def _key(sun_sign, rising_sign):
+        return f"{sun_sign}|{rising_sign}"
+
+    def _file_stamp(self):
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _refresh(self):
+        # Reload when another process (or store instance) has rewritten the file
+        stamp = self._file_stamp()
+        if stamp != self._stamp:
+            self._descriptions = self._load()
+            self._stamp = stamp
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as file:
+                return json.load(file)
+        except FileNotFoundError:
+            return {}
+        except json.JSONDecodeError:
+            print(f"Ignoring corrupt description store: {self.path}")
+            return {}
+
+    def _save(self):
+        # Write to a temporary file first so readers never see a partial store
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as file:
+            json.dump(self._descriptions, file, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, self.path)
+        self._stamp = self._file_stamp()
+
+    def _generate(self, sun_sign, rising_sign, count):
+        if self._generator is None:
+            from app.ai_description import generate_local_descriptions
+            self._generator = generate_local_descriptions
+        return self._generator(sun_sign, rising_sign, count)
+
+    def variants(self, sun_sign, rising_sign):
+        """Return the stored variants for a combination (may be empty)."""
+        with self._lock:
+            self._refresh()
+        return list(self._descriptions.get(self._key(sun_sign, rising_sign), []))
+
+    def add(self, sun_sign, rising_sign, descriptions):
+        """Append descriptions to a combination and persist the store."""
+        os.makedirs(self.directory, exist_ok=True)
+        with self._lock, _file_lock(self.path + ".lock"):
+            # Merge into the file's current contents so other writers' variants are kept
+            self._descriptions = self._load()
+            self._descriptions.setdefault(self._key(sun_sign, rising_sign), []).extend(descriptions)
+            self._save()
+
+    def get(self, sun_sign, rising_sign):
+        """
+        Get a description for a Sun / Rising combination.
+
+        Args:
+            sun_sign (str): The user's sun sign.
+            rising_sign (str): The user's rising sign.
+
+        Returns:
+            str: A stored variant, a freshly generated one on a cache miss, or
+                None if generation failed or timed out.
+        """
+        variants = self.variants(sun_sign, rising_sign)
+        if variants:
+            return random.choice(variants)
+
+        print(f"Description cache miss: {sun_sign} / {rising_sign}")
+        try:
+            descriptions = self._generate(sun_sign, rising_sign, 1)
+        except (ValueError, FutureTimeoutError) as e:
+            print(f"Error generating description: {e!r}")
+            return None
+        self.add(sun_sign, rising_sign, descriptions)
+        return descriptions[0]
+
+    def fill(self, variants=3):
+        """
+        Generate descriptions until every combination has `variants` entries.
+
+        Args:
+            variants (int): Target number of variants per combination.
+
+        Returns:
+            int: Number of descriptions generated.
+        """
+        generated = 0
+        for sun_sign in ZODIAC_SIGNS:
+            for rising_sign in ZODIAC_SIGNS:
+                missing = variants - len(self.variants(sun_sign, rising_sign))
+                if missing <= 0:
+                    continue
+                self.add(sun_sign, rising_sign, self._generate(sun_sign, rising_sign, missing))
+                generated += missing
+        return generated
+
+    def fill_in_background(self, variants=3):
+        """Run `fill` in a daemon thread and return the thread."""
+        thread = threading.Thread(target=self.fill, args=(variants,), daemon=True)
+        thread.start()
+        return thread
+
+_store = None
+
+def _generate_with_worker(sun_sign, rising_sign, count):
+    # Imported lazily so the worker process is only spawned on a cache miss
+    from app.inference_worker import get_inference_worker
+    return get_inference_worker().generate(sun_sign, rising_sign, count)
+
+def get_description_store():
+    """
+    Return the process-wide description store.
+
+    Misses are generated by the batched inference worker, keeping the model
+    out of the web process. The store lives in Config.DESCRIPTION_STORE_DIR,
+    read from the config class so the offline build (which runs without an
+    app) uses the same directory as the web app.
+    """
+    global _store
+    if _store is None:
+        _store = DescriptionStore(
+            Config.DESCRIPTION_STORE_DIR,
+            version=get_store_version(quantized=True),
+            generator=_generate_with_worker,
+        )
+    return _store
+
+def get_description(sun_sign, rising_sign):
+    """Get a description for a Sun / Rising combination from the shared store."""
+    return get_description_store().get(sun_sign, rising_sign)
+
+if __name__ == "__main__":
+    # Offline build: python -m app.description_store [variants]
+    import sys
+
+    target = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    store = get_description_store()
+    count = store.fill(target)
+    print(f"Generated {count} descriptions into {store.path}")
\ No newline at end of file
@@ -0,0 +1,86 @@
+import glob
+import os
+import threading
+from collections import Counter
+
+import swisseph as swe
+
+# ? EPHEMERIS PRECISION TIERS
+# fast:    Moshier analytical ephemeris, built into the library (~1 arcsecond, no files)
+# precise: Swiss Ephemeris .se1 data files (~0.001 arcsecond), set with configure_ephemeris
+TIER_FAST = "fast"
+TIER_PRECISE = "precise"
+TIER_FLAGS = {
+    TIER_FAST: swe.FLG_MOSEPH,
+    TIER_PRECISE: swe.FLG_SWIEPH,
+}
+
+_default_tier = TIER_PRECISE
+_metrics = Counter()
+_metrics_lock = threading.Lock()
+
+def configure_ephemeris(path=None, default_tier=TIER_PRECISE):
+    """
+    Point Swiss Ephemeris at its data files and choose the default tier.
+
+    The C library opens and reads the .se1 files itself; the OS page cache
+    already shares their pages between worker processes.
+
+    Args:
+        path (str): Directory holding the .se1 files (None keeps Moshier only).
+        default_tier (str): Tier used when a call does not select one.
+    """
+    global _default_tier
+    _default_tier = resolve_tier(default_tier)
+
+    if not path:
+        return
+    swe.set_ephe_path(path)
+
+    if not glob.glob(os.path.join(path, "*.se1")):
+        print(f"No Swiss Ephemeris files in {path}; the precise tier will fall back to Moshier")
+
+def resolve_tier(tier=None):
+    """
+    Validate a tier name, falling back to the configured default.
+
+    Raises:
+        ValueError: If the tier is unknown.
+    """
+    if not tier:
+        return _default_tier
+    if tier not in TIER_FLAGS:
+        raise ValueError(f"Unknown ephemeris tier: {tier} (expected one of {', '.join(TIER_FLAGS)})")
+    return tier
+
+def calc_ut(julian_day, body, tier=None, flags=0):
+    """
+    Calculate a body's position with the requested precision tier.
+
+    Args:
+        julian_day (float): Julian day number (UT).
+        body (int): Swiss Ephemeris body constant (e.g., swe.SUN).
+        tier (str): "fast" or "precise" (None for the default tier).
+        flags (int): Extra calculation flags (e.g., swe.FLG_SPEED).
+
+    Returns:
+        tuple: Position tuple as returned by swe.calc_ut (longitude first).
+    """
+    tier = resolve_tier(tier)
+    position, return_flags = swe.calc_ut(julian_day, body, TIER_FLAGS[tier] | flags)
+
+    # Swiss Ephemeris silently falls back to Moshier when a data file is missing
+    served = TIER_FAST if return_flags & swe.FLG_MOSEPH else TIER_PRECISE
+    with _metrics_lock:
+        _metrics[(tier, served)] += 1
+    return position
+
+def get_tier_metrics():
+    """
+    Return how many calculations each tier served.
+
+    Returns:
+        dict: {"<requested>-><served>": count}, e.g. {"precise->fast": 12}.
+    """
+    with _metrics_lock:
+        return {f"{requested}->{served}": count for (requested, served), count in _metrics.items()}
\ No newline at end of file
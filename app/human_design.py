@@ -1,7 +1,49 @@
 from datetime import datetime
 import swisseph as swe
 from pytz import timezone, utc
-from timezonefinder import TimezoneFinder
+from app.astrology import get_timezone_finder
+from app.ephemeris import calc_ut
+
+PLANETS = ["SUN", "MOON", "MERCURY", "VENUS", "MARS", "JUPITER", "SATURN", "URANUS", "NEPTUNE", "PLUTO"]
+
+# Gates belonging to each of the nine centers
+CENTER_GATES = {
+    "Head": [64, 61, 63],
+    "Ajna": [47, 24, 4, 17, 43, 11],
+    "Throat": [62, 23, 56, 35, 12, 45, 33, 8, 31, 20, 16],
+    "G": [1, 13, 25, 46, 2, 15, 10, 7],
+    "Heart": [21, 40, 26, 51],
+    "Spleen": [48, 57, 44, 50, 32, 28, 18],
+    "Solar Plexus": [6, 37, 22, 36, 30, 55, 49],
+    "Sacral": [5, 14, 29, 59, 9, 3, 42, 27, 34],
+    "Root": [53, 60, 52, 19, 39, 41, 58, 38, 54],
+}
+
+# (Sun gate, Earth gate) to Incarnation Cross names; gates here are 0-based (int(degree / 5.625))
+INCARNATION_CROSSES = {
+    (61, 62): "Right Angle Cross of Maya",
+    (32, 42): "Right Angle Cross of the Sphinx",
+    (5, 6): "Right Angle Cross of Alignment",
+    (29, 46): "Right Angle Cross of Rulership",
+    (37, 40): "Right Angle Cross of Service",
+    (35, 47): "Right Angle Cross of Consciousness",
+    (41, 31): "Right Angle Cross of the Unexpected",
+    (34, 20): "Right Angle Cross of the Sleeping Phoenix",
+    (36, 6): "Left Angle Cross of Education",
+    (13, 7): "Left Angle Cross of Cycles",
+    (50, 3): "Left Angle Cross of Healing",
+    (10, 15): "Left Angle Cross of Defiance",
+    (26, 45): "Left Angle Cross of Influence",
+    (12, 22): "Left Angle Cross of the Plane",
+    (24, 44): "Left Angle Cross of Distraction",
+    (64, 47): "Left Angle Cross of Dominion",
+    (53, 54): "Juxtaposition Cross of Beginnings",
+    (38, 39): "Juxtaposition Cross of Opposition",
+    (19, 33): "Juxtaposition Cross of Sensitivity",
+    (42, 3): "Juxtaposition Cross of Completion",
+    (28, 32): "Juxtaposition Cross of Risk",
+    (45, 26): "Juxtaposition Cross of Rulership",
+}
 
 def get_timezone_from_coordinates(latitude, longitude):
     """
@@ -14,13 +56,13 @@ def get_timezone_from_coordinates(latitude, longitude):
     Returns:
         str: IANA time zone name (e.g., "Europe/Bucharest").
     """
-    tf = TimezoneFinder()
+    tf = get_timezone_finder()
     timezone_name = tf.timezone_at(lat=latitude, lng=longitude)
     if timezone_name is None:
         raise ValueError(f"Could not determine time zone for coordinates: {latitude}, {longitude}")
     return timezone_name
 
-def calculate_human_design(dob, birth_time, latitude, longitude):
+def calculate_human_design(dob, birth_time, latitude, longitude, tier=None):
     """
     Calculate Human Design foundational properties using local algorithms.
 
@@ -29,14 +71,16 @@ def calculate_human_design(dob, birth_time, latitude, longitude):
         birth_time (str): Time of birth in HH:MM format (24-hour clock).
         latitude (float): Latitude of birth location.
         longitude (float): Longitude of birth location.
+        tier (str): Ephemeris precision tier ("fast" or "precise", None for the default).
 
     Returns:
-        dict: Foundational Human Design properties including Type, Strategy, Authority, etc.
+        dict: Foundational Human Design properties including Type, Strategy, Authority, etc.,
+            plus the planetary positions they were derived from.
     """
     try:
         # Parse and localize birth datetime
         naive_datetime = datetime.strptime(f"{dob} {birth_time}", "%Y-%m-%d %H:%M")
-        tf = TimezoneFinder()
+        tf = get_timezone_finder()
         timezone_name = tf.timezone_at(lat=latitude, lng=longitude)
         if not timezone_name:
             raise ValueError(f"Could not determine timezone for coordinates: {latitude}, {longitude}")
@@ -52,7 +96,7 @@ def calculate_human_design(dob, birth_time, latitude, longitude):
         )
 
         # Calculate planetary positions
-        planetary_positions = calculate_planetary_positions(julian_day)
+        planetary_positions = calculate_planetary_positions(julian_day, tier)
 
         # Determine foundational properties
         type_ = determine_human_design_type(planetary_positions)
@@ -74,25 +118,27 @@ def calculate_human_design(dob, birth_time, latitude, longitude):
             "Authority": authority,
             "Profile": profile,
             "Incarnation Cross": incarnation_cross,
+            "Planetary Positions": planetary_positions,
+            "Julian Day": julian_day,
         }
     except Exception as e:
         raise ValueError(f"Error calculating Human Design properties: {e}")
 
-def calculate_planetary_positions(julian_day):
+def calculate_planetary_positions(julian_day, tier=None):
     """
     Calculate the positions of the major celestial bodies.
 
     Args:
         julian_day (float): Julian day number.
+        tier (str): Ephemeris precision tier ("fast" or "precise", None for the default).
 
     Returns:
         dict: Planetary positions (degrees) keyed by planet.
     """
-    planets = ["SUN", "MOON", "MERCURY", "VENUS", "MARS", "JUPITER", "SATURN", "URANUS", "NEPTUNE", "PLUTO"]
     positions = {}
 
-    for planet in planets:
-        position, _ = swe.calc_ut(julian_day, getattr(swe, planet))
+    for planet in PLANETS:
+        position = calc_ut(julian_day, getattr(swe, planet), tier)
         positions[planet] = position[0]  # Longitude in degrees
 
     # Add Earth position (opposite of Sun)
@@ -283,34 +329,9 @@ def determine_incarnation_cross(planetary_positions):
     sun_gate = int(planetary_positions["SUN"] / 5.625)
     earth_gate = int(planetary_positions["EARTH"] / 5.625)
 
-    # Example mapping of gates to Incarnation Cross names
-    incarnation_crosses = {
-        (61, 62): "Right Angle Cross of Maya",
-        (32, 42): "Right Angle Cross of the Sphinx",
-        (5, 6): "Right Angle Cross of Alignment",
-        (29, 46): "Right Angle Cross of Rulership",
-        (37, 40): "Right Angle Cross of Service",
-        (35, 47): "Right Angle Cross of Consciousness",
-        (41, 31): "Right Angle Cross of the Unexpected",
-        (34, 20): "Right Angle Cross of the Sleeping Phoenix",
-        (36, 6): "Left Angle Cross of Education",
-        (13, 7): "Left Angle Cross of Cycles",
-        (50, 3): "Left Angle Cross of Healing",
-        (10, 15): "Left Angle Cross of Defiance",
-        (26, 45): "Left Angle Cross of Influence",
-        (12, 22): "Left Angle Cross of the Plane",
-        (24, 44): "Left Angle Cross of Distraction",
-        (64, 47): "Left Angle Cross of Dominion",
-        (53, 54): "Juxtaposition Cross of Beginnings",
-        (38, 39): "Juxtaposition Cross of Opposition",
-        (19, 33): "Juxtaposition Cross of Sensitivity",
-        (42, 3): "Juxtaposition Cross of Completion",
-        (28, 32): "Juxtaposition Cross of Risk",
-        (45, 26): "Juxtaposition Cross of Rulership",
-    }
     
         # Attempt to match the Sun and Earth gates to a known cross
-    cross_name = incarnation_crosses.get((sun_gate, earth_gate))
+    cross_name = INCARNATION_CROSSES.get((sun_gate, earth_gate))
     
     if cross_name is None:
         return f"Custom Cross (Sun Gate: {sun_gate}, Earth Gate: {earth_gate})"
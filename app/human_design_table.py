@@ -0,0 +1,316 @@
+import os
+import struct
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import click
+import numpy as np
+import swisseph as swe
+from flask import current_app
+from flask.cli import AppGroup
+
+from app.chart_record import AUTHORITIES, CROSSES, DEFINITIONS, TYPES, enum_code, enum_name
+from app.ephemeris import calc_ut, configure_ephemeris, resolve_tier
+from app.human_design import (
+    PLANETS,
+    determine_authority,
+    determine_definition,
+    determine_human_design_type,
+    determine_incarnation_cross,
+    determine_not_self_theme,
+    determine_profile,
+    determine_signature,
+    determine_strategy,
+)
+from app.tz_tables import local_to_julian_day
+
+human_design_cli = AppGroup("human-design", help="Precomputed Human Design tables.")
+
+GATE_SIZE = 360 / 64
+LINE_SIZE = GATE_SIZE / 6
+
+# Type, Authority, Profile, Definition and Cross only depend on which gate each
+# body is in and on the Sun's line (Earth is always opposite the Sun), so they
+# can change only when a body crosses a gate boundary or the Sun a line boundary.
+# Each body is sampled at a step short enough for at most one crossing between
+# samples (stations are resampled hourly), then every crossing is solved exactly.
+SAMPLE_STEPS = {  # days
+    "SUN": 0.5, "MOON": 0.25, "MERCURY": 1, "VENUS": 1, "MARS": 1,
+    "JUPITER": 2, "SATURN": 2, "URANUS": 2, "NEPTUNE": 2, "PLUTO": 2,
+}
+CROSSING_TOLERANCE = 1e-6  # days (~0.1 s)
+
+RUN_DTYPE = np.dtype({
+    "names": ["start", "type", "authority", "profile", "definition", "cross", "sun_gate"],
+    "formats": ["<f8", "u1", "u1", "u1", "u1", "u1", "u1"],
+    "offsets": [0, 8, 9, 10, 11, 12, 13],
+    "itemsize": 16,
+})
+
+# File header: magic, version, run size, Julian day (UT) at which the last run ends
+FILE_HEADER = struct.Struct("<4sHHd")
+FILE_MAGIC = b"HDRL"
+TABLE_VERSION = 1
+
+def _segment_size(body):
+    return LINE_SIZE if body == "SUN" else GATE_SIZE
+
+def _wrap(delta):
+    return (delta + 180) % 360 - 180
+
+def _sample(body, julian_days, tier):
+    planet = getattr(swe, body)
+    positions = [calc_ut(julian_day, planet, tier, swe.FLG_SPEED) for julian_day in julian_days]
+    return np.array([position[0] for position in positions]), np.array([position[3] for position in positions])
+
+def _find_crossing(body, start, end, boundary, tier):
+    """Solve for the instant a body's longitude crosses `boundary` within [start, end] (Illinois method)."""
+    planet = getattr(swe, body)
+
+    def offset(julian_day):
+        return _wrap(calc_ut(julian_day, planet, tier)[0] - boundary)
+
+    low, high = start, end
+    f_low, f_high = offset(low), offset(high)
+    side = 0
+    for _ in range(60):
+        middle = (low * f_high - high * f_low) / (f_high - f_low)
+        f_middle = offset(middle)
+        if f_middle == 0:
+            return middle
+        if (f_middle > 0) == (f_high > 0):
+            high, f_high = middle, f_middle
+            if side == -1:
+                f_low /= 2
+            side = -1
+        else:
+            low, f_low = middle, f_middle
+            if side == 1:
+                f_high /= 2
+            side = 1
+        if high - low < CROSSING_TOLERANCE:
+            break
+    return high
+
+def body_crossings(body, start, end, tier):
+    """
+    Find when a body changes segment (gate, or line for the Sun) in [start, end).
+
+    Returns:
+        tuple: (initial segment index, [(julian_day, new segment index), ...])
+    """
+    size = _segment_size(body)
+    count = round(360 / size)
+    step = SAMPLE_STEPS[body]
+    times = np.arange(start, end + step, step)
+    longitudes, speeds = _sample(body, times, tier)
+
+    # A station (speed changes sign) can cross and recross a boundary between samples
+    stations = np.nonzero(np.sign(speeds[:-1]) != np.sign(speeds[1:]))[0]
+    if len(stations):
+        extra_times = np.concatenate([np.arange(times[i], times[i + 1], 1 / 24)[1:] for i in stations])
+        extra_longitudes, _ = _sample(body, extra_times, tier)
+        times = np.concatenate([times, extra_times])
+        longitudes = np.concatenate([longitudes, extra_longitudes])
+        order = np.argsort(times)
+        times, longitudes = times[order], longitudes[order]
+
+    segments = (longitudes // size).astype(int) % count
+    crossings = []
+    for i in np.nonzero(segments[:-1] != segments[1:])[0]:
+        forward = _wrap(longitudes[i + 1] - longitudes[i]) > 0
+        boundary = (segments[i + 1] if forward else segments[i]) * size
+        crossing = _find_crossing(body, times[i], times[i + 1], boundary, tier)
+        if start <= crossing < end:
+            crossings.append((crossing, int(segments[i + 1])))
+    return int(segments[0]), crossings
+
+def outcome_codes(segments):
+    """
+    Human Design outcome codes for a combination of body segments.
+
+    Args:
+        segments (dict): Sun line index (0-383) and gate index (0-63) of every other body.
+
+    Returns:
+        tuple: (type, authority, profile, definition, cross, sun_gate) codes.
+    """
+    # A longitude in the middle of each segment gives the same gates and lines as the real one
+    positions = {
+        body: (segments[body] + 0.5) * _segment_size(body)
+        for body in PLANETS
+    }
+    positions["EARTH"] = (positions["SUN"] + 180) % 360
+    type_ = determine_human_design_type(positions)
+    sun_line, earth_line = (int(line) for line in determine_profile(positions).split("/"))
+    return (
+        enum_code(TYPES, type_),
+        enum_code(AUTHORITIES, determine_authority(type_, positions)),
+        (sun_line - 1) * 6 + earth_line,
+        enum_code(DEFINITIONS, determine_definition(positions)),
+        enum_code(CROSSES, determine_incarnation_cross(positions)),
+        segments["SUN"] // 6 + 1,
+    )
+
+def build_runs(start, end, tier=None):
+    """
+    Compute the run-length table of Human Design outcomes over [start, end).
+
+    Args:
+        start (float): First Julian day (UT).
+        end (float): Julian day (UT) at which the table ends.
+        tier (str): Ephemeris precision tier.
+
+    Returns:
+        numpy.ndarray: Runs of RUN_DTYPE, ordered by start.
+    """
+    tier = resolve_tier(tier)
+    segments = {}
+    events = []
+    for body in PLANETS:
+        segments[body], crossings = body_crossings(body, start, end, tier)
+        events += [(julian_day, body, segment) for julian_day, segment in crossings]
+    events.sort()
+
+    runs = [(start,) + outcome_codes(segments)]
+    for julian_day, body, segment in events:
+        segments[body] = segment
+        codes = outcome_codes(segments)
+        if codes != runs[-1][1:]:
+            runs.append((julian_day,) + codes)
+    return np.array(runs, dtype=RUN_DTYPE)
+
+def _init_worker(ephemeris_path, tier):
+    sys.stdout = open(os.devnull, "w")
+    configure_ephemeris(ephemeris_path, tier)
+
+def _build_span(span):
+    start, end, tier = span
+    return build_runs(start, end, tier)
+
+def write_table(path, runs, end):
+    """Write runs to a table file (atomically replacing an old one)."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as file:
+        file.write(FILE_HEADER.pack(FILE_MAGIC, TABLE_VERSION, RUN_DTYPE.itemsize, end))
+        file.write(np.asarray(runs, dtype=RUN_DTYPE).tobytes())
+    os.replace(tmp_path, path)
+
+class HumanDesignTable:
+    """
+    Memory-mapped run-length table of Human Design outcomes by UTC instant.
+
+    Lookups binary-search the run start times; nothing is read from disk
+    beyond the pages the search touches.
+    """
+
+    def __init__(self, path):
+        with open(path, "rb") as file:
+            magic, version, itemsize, end = FILE_HEADER.unpack(file.read(FILE_HEADER.size))
+        if magic != FILE_MAGIC:
+            raise ValueError(f"{path} is not a Human Design table")
+        if version != TABLE_VERSION or itemsize != RUN_DTYPE.itemsize:
+            raise ValueError(f"Unsupported Human Design table version {version}")
+        self.runs = np.memmap(path, dtype=RUN_DTYPE, mode="r", offset=FILE_HEADER.size)
+        self.starts = self.runs["start"]
+        self.start = float(self.starts[0])
+        self.end = end
+
+    def run_indices(self, julian_days):
+        """
+        Index of the run covering each instant (vectorized).
+
+        Raises:
+            ValueError: If an instant is outside the table's range.
+        """
+        julian_days = np.asarray(julian_days, dtype=np.float64)
+        if np.any((julian_days < self.start) | (julian_days >= self.end)):
+            raise ValueError("Instant outside the precomputed Human Design table")
+        return np.searchsorted(self.starts, julian_days, side="right") - 1
+
+    def lookup_codes(self, julian_days):
+        """Outcome codes (RUN_DTYPE records) for many instants at once."""
+        return self.runs[self.run_indices(julian_days)]
+
+    def lookup(self, julian_day):
+        """
+        Human Design properties at one UTC instant.
+
+        Returns:
+            dict: The same properties as `calculate_human_design`, without planetary positions.
+        """
+        run = self.runs[int(self.run_indices(julian_day))]
+        type_ = enum_name(TYPES, run["type"])
+        profile = int(run["profile"]) - 1
+        cross = enum_name(CROSSES, run["cross"])
+        if run["cross"] == 0:
+            sun_gate = int(run["sun_gate"]) - 1
+            cross = f"Custom Cross (Sun Gate: {sun_gate}, Earth Gate: {(sun_gate + 32) % 64})"
+        return {
+            "Type": type_,
+            "Strategy": determine_strategy(type_),
+            "Not-Self Theme": determine_not_self_theme(type_),
+            "Signature": determine_signature(type_),
+            "Definition": enum_name(DEFINITIONS, run["definition"]),
+            "Authority": enum_name(AUTHORITIES, run["authority"]),
+            "Profile": f"{profile // 6 + 1}/{profile % 6 + 1}",
+            "Incarnation Cross": cross,
+        }
+
+_tables = {}
+
+def get_human_design_table(path):
+    """Open a table once per process and reuse it."""
+    if path not in _tables:
+        _tables[path] = HumanDesignTable(path)
+    return _tables[path]
+
+def lookup_human_design(table, dob, birth_time, timezone_name):
+    """
+    Human Design properties for a local birth time, without ephemeris calls.
+
+    Args:
+        table (HumanDesignTable): Table covering the birth date.
+        dob (str): Date of birth in YYYY-MM-DD format.
+        birth_time (str): Time of birth in HH:MM format (24-hour).
+        timezone_name (str): IANA time zone of the birth location.
+    """
+    julian_day = local_to_julian_day(timezone_name, [dob], [birth_time])[0]
+    return table.lookup(julian_day)
+
+@human_design_cli.command("build-table")
+@click.option("--start-year", type=int, default=1900, show_default=True)
+@click.option("--end-year", type=int, default=2100, show_default=True, help="The table ends on Jan 1 of this year.")
+@click.option("--span-years", type=int, default=10, show_default=True, help="Years computed per work unit.")
+@click.option("--workers", type=int, default=os.cpu_count(), show_default=True, help="Worker processes.")
+@click.option("--tier", type=click.Choice(["fast", "precise"]), help="Ephemeris precision tier.")
+def build_table(start_year, end_year, span_years, workers, tier):
+    """Precompute the Human Design run-length table to HUMAN_DESIGN_TABLE_PATH."""
+    tier = resolve_tier(tier)
+    years = list(range(start_year, end_year, span_years)) + [end_year]
+    spans = [(swe.julday(first, 1, 1, 0.0), swe.julday(last, 1, 1, 0.0), tier) for first, last in zip(years, years[1:])]
+
+    started = time.perf_counter()
+    parts = []
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(current_app.config["EPHEMERIS_PATH"], tier),
+    ) as executor:
+        for (first, _, _), runs in zip(spans, executor.map(_build_span, spans)):
+            # Drop a span's first run when it continues the previous span's last run
+            if parts and tuple(runs[0])[1:] == tuple(parts[-1][-1])[1:]:
+                runs = runs[1:]
+            parts.append(runs)
+            click.echo(f"{swe.revjul(first)[0]}: {len(runs)} runs", err=True)
+
+    runs = np.concatenate(parts)
+    path = current_app.config["HUMAN_DESIGN_TABLE_PATH"]
+    write_table(path, runs, spans[-1][1])
+    click.echo(
+        f"Wrote {len(runs)} runs ({os.path.getsize(path) / 1e6:.1f} MB) to {path} "
+        f"in {time.perf_counter() - started:.0f}s",
+        err=True,
+    )
\ No newline at end of file
@@ -0,0 +1,306 @@
+import itertools
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from app.ai_description import GENERATION_PARAMS, build_prompt
+from config import Config
+
+def quantize_model(model):
+    """
+    Apply dynamic int8 quantization to a GPT-2 model for CPU inference.
+
+    GPT-2 implements its projections with transformers' Conv1D rather than
+    nn.Linear, which `quantize_dynamic` ignores, so they are converted to
+    equivalent Linear layers first.
+
+    Args:
+        model: A GPT2LMHeadModel in eval mode.
+
+    Returns:
+        The quantized model.
+    """
+    import torch
+    from transformers.pytorch_utils import Conv1D
+
+    def convert(module):
+        for name, child in module.named_children():
+            if isinstance(child, Conv1D):
+                in_features, out_features = child.weight.shape
+                linear = torch.nn.Linear(in_features, out_features)
+                linear.weight.data = child.weight.data.t().contiguous()
+                linear.bias.data = child.bias.data
+                setattr(module, name, linear)
+            else:
+                convert(child)
+
+    convert(model)
+    return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+def _collect_batch(request_queue, batch_window, max_batch_size):
+    """
+    Block for the first request, then gather more until the window closes.
+
+    Returns:
+        tuple: (batch, stop) where stop is True once the shutdown sentinel was seen.
+    """
+    first = request_queue.get()
+    if first is None:
+        return [], True
+
+    batch = [first]
+    deadline = time.monotonic() + batch_window
+    while len(batch) < max_batch_size:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        try:
+            item = request_queue.get(timeout=remaining)
+        except queue.Empty:
+            break
+        if item is None:
+            return batch, True
+        batch.append(item)
+    return batch, False
+
+def batch_generation_params(prompt_lengths):
+    """
+    GENERATION_PARAMS for one left-padded batch.
+
+    `max_length` would count each prompt's padding, so shorter prompts in a
+    batch would get fewer new tokens than when generated alone. It is
+    replaced by `max_new_tokens`, set to what the shortest prompt would get.
+    """
+    params = dict(GENERATION_PARAMS)
+    max_length = params.pop("max_length")
+    params["max_new_tokens"] = max(1, max_length - min(prompt_lengths))
+    return params
+
+def _serve(request_queue, response_queue, batch_window, max_batch_size, quantize, threads):
+    """Worker process loop: load the model once, then answer batches of prompts."""
+    import torch
+    from app.ai_description import load_model
+
+    torch.set_num_threads(threads)
+    load_error = None
+    try:
+        tokenizer, model = load_model()
+        tokenizer.pad_token = tokenizer.eos_token
+        tokenizer.padding_side = "left"  # Decoder-only models must be padded on the left
+        model.eval()
+        if quantize:
+            model = quantize_model(model)
+    except Exception as e:
+        # Keep serving so callers get an error instead of waiting forever
+        load_error = f"Error loading model: {e}"
+
+    stop = False
+    while not stop:
+        batch, stop = _collect_batch(request_queue, batch_window, max_batch_size)
+        if not batch:
+            continue
+
+        request_ids = [request_id for request_id, _ in batch]
+        prompts = [prompt for _, prompt in batch]
+        if load_error:
+            for request_id in request_ids:
+                response_queue.put((request_id, None, load_error))
+            continue
+        try:
+            inputs = tokenizer(prompts, return_tensors="pt", padding=True)
+            with torch.inference_mode():
+                outputs = model.generate(
+                    **inputs,
+                    num_return_sequences=1,
+                    pad_token_id=tokenizer.eos_token_id,
+                    **batch_generation_params(inputs["attention_mask"].sum(dim=1).tolist()),
+                )
+            texts = tokenizer.batch_decode(outputs, skip_special_tokens=True)
+            for request_id, text in zip(request_ids, texts):
+                response_queue.put((request_id, text, None))
+        except Exception as e:
+            for request_id in request_ids:
+                response_queue.put((request_id, None, f"Error generating description: {e}"))
+
+class InferenceWorker:
+    """
+    Out-of-process text generation with dynamic batching.
+
+    Prompts submitted from any thread are queued to one or more worker
+    processes. Each process waits up to `batch_window` seconds after the
+    first prompt to collect a batch, runs a single `model.generate` for it
+    and sends the texts back, where they resolve the callers' futures.
+    If a process dies (e.g. OOM-killed), every pending prompt fails and the
+    processes are restarted.
+    """
+
+    def __init__(self, batch_window=0.02, max_batch_size=16, processes=1, threads=None, quantize=True,
+                 health_check_interval=1.0):
+        """
+        Args:
+            batch_window (float): Seconds to wait for more prompts after the first.
+            max_batch_size (int): Maximum prompts per `model.generate` call.
+            processes (int): Number of worker processes sharing the queue.
+            threads (int): Torch threads per process, defaults to an even CPU split.
+            quantize (bool): Run a dynamically int8-quantized model.
+            health_check_interval (float): Seconds between checks for dead worker processes.
+        """
+        self.batch_window = batch_window
+        self.max_batch_size = max_batch_size
+        self.processes = processes
+        self.threads = threads or max(1, (os.cpu_count() or 1) // processes)
+        self.quantize = quantize
+        self.health_check_interval = health_check_interval
+
+        self._context = multiprocessing.get_context("spawn")
+        self._request_queue = None
+        self._response_queue = None
+        self._workers = []
+        self._receiver = None
+        self._futures = {}
+        self._lock = threading.Lock()
+        self._workers_lock = threading.Lock()
+        self._ids = itertools.count()
+        self._stopping = False
+
+    def _start_worker(self):
+        process = self._context.Process(
+            target=_serve,
+            args=(
+                self._request_queue, self._response_queue, self.batch_window,
+                self.max_batch_size, self.quantize, self.threads,
+            ),
+            daemon=True,
+        )
+        process.start()
+        return process
+
+    def start(self):
+        """Start the worker processes and the response receiver thread."""
+        self._request_queue = self._context.Queue()
+        self._response_queue = self._context.Queue()
+        self._workers = [self._start_worker() for _ in range(self.processes)]
+
+        self._receiver = threading.Thread(target=self._receive, daemon=True)
+        self._receiver.start()
+        return self
+
+    def _check_workers(self):
+        # A process killed while holding a queue's lock leaves that queue
+        # unusable, so a death replaces both queues and all processes; the
+        # prompts queued or in progress are lost and their futures fail.
+        with self._workers_lock:
+            dead = [process for process in self._workers if not process.is_alive()]
+            if self._stopping or not dead:
+                return
+            error = f"Inference worker {dead[0].pid} exited with code {dead[0].exitcode}"
+            print(f"{error}; restarting the inference workers")
+            for process in self._workers:
+                process.kill()
+                process.join()
+            with self._lock:
+                self._request_queue = self._context.Queue()
+                self._response_queue = self._context.Queue()
+                failed, self._futures = self._futures, {}
+            self._workers = [self._start_worker() for _ in range(self.processes)]
+        for future in failed.values():
+            future.set_exception(ValueError(error))
+
+    def _receive(self):
+        next_check = time.monotonic() + self.health_check_interval
+        while True:
+            try:
+                message = self._response_queue.get(timeout=self.health_check_interval)
+            except queue.Empty:
+                message = ()
+            if message is None:
+                break
+            if time.monotonic() >= next_check:
+                self._check_workers()
+                next_check = time.monotonic() + self.health_check_interval
+            if not message:
+                continue
+
+            request_id, text, error = message
+            with self._lock:
+                future = self._futures.pop(request_id, None)
+            if future is None:
+                continue
+            if error is None:
+                future.set_result(text)
+            else:
+                future.set_exception(ValueError(error))
+
+    def submit(self, prompt):
+        """
+        Queue a prompt for generation.
+
+        Args:
+            prompt (str): The prompt text.
+
+        Returns:
+            Future: Resolves to the generated text.
+        """
+        future = Future()
+        request_id = next(self._ids)
+        with self._lock:
+            self._futures[request_id] = future
+            self._request_queue.put((request_id, prompt))
+        return future
+
+    def generate(self, sun_sign, rising_sign, count=1, timeout=120):
+        """
+        Generate description variants, matching `generate_local_descriptions`.
+
+        Args:
+            timeout (float): Seconds to wait for all the variants together (None
+                waits forever; the default leaves room for the worker to load the model).
+
+        Returns:
+            list: Generated descriptions.
+
+        Raises:
+            ValueError: If generation failed or its worker process died.
+            concurrent.futures.TimeoutError: If the variants are not ready within
+                `timeout` (the builtin TimeoutError only from Python 3.11).
+        """
+        prompt = build_prompt(sun_sign, rising_sign)
+        futures = [self.submit(prompt) for _ in range(count)]
+        if timeout is None:
+            return [future.result() for future in futures]
+        deadline = time.monotonic() + timeout
+        descriptions = []
+        for future in futures:
+            remaining = max(0, deadline - time.monotonic())
+            descriptions.append(future.result(timeout=remaining))
+        return descriptions
+
+    def stop(self):
+        """Stop the worker processes and the receiver thread."""
+        with self._workers_lock:
+            self._stopping = True
+        for _ in self._workers:
+            self._request_queue.put(None)
+        for process in self._workers:
+            process.join()
+        self._response_queue.put(None)
+        self._receiver.join()
+        self._workers = []
+
+_worker = None
+_worker_lock = threading.Lock()
+
+def get_inference_worker():
+    """Return the process-wide inference worker, starting it on first use."""
+    global _worker
+    with _worker_lock:
+        if _worker is None:
+            _worker = InferenceWorker(
+                batch_window=Config.INFERENCE_BATCH_WINDOW_MS / 1000,
+                max_batch_size=Config.INFERENCE_MAX_BATCH,
+                processes=Config.INFERENCE_PROCESSES,
+            ).start()
+    return _worker
\ No newline at end of file
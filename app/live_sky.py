@@ -0,0 +1,101 @@
+import threading
+from datetime import datetime
+
+from flask import current_app, session
+from flask_socketio import emit, join_room, leave_room, rooms
+
+from app import socketio
+from app.human_design import calculate_planetary_positions, get_human_design_gate
+from app.routes import get_session_results
+from app.transits import julian_day_for
+
+NAMESPACE = "/sky"
+
+def _gate_room(gate):
+    return f"gate:{gate}"
+
+class SkyBroadcaster:
+    """
+    One background task that computes the current sky and broadcasts changes.
+
+    Every interval the positions are computed once and only the bodies whose
+    rounded longitude or gate changed are sent. Personal alerts go to one
+    room per gate, so a tick costs the same however many clients listen.
+    """
+
+    def __init__(self):
+        self.snapshot = None
+        self._started = False
+        self._lock = threading.Lock()
+
+    def start(self, interval):
+        """Start the background task on first use."""
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+        socketio.start_background_task(self._run, interval)
+
+    def _run(self, interval):
+        while True:
+            try:
+                self.tick()
+            except Exception as e:
+                print(f"Live sky update failed: {e}")
+            socketio.sleep(interval)
+
+    def tick(self, moment=None):
+        """Compute the sky at `moment` (default now) and broadcast the diff."""
+        julian_day = julian_day_for(moment or datetime.utcnow())
+        positions = calculate_planetary_positions(julian_day)
+        snapshot = {
+            "julian_day": julian_day,
+            "positions": {body: round(degree, 2) for body, degree in positions.items()},
+            "gates": {body: get_human_design_gate(degree) for body, degree in positions.items()},
+        }
+        previous, self.snapshot = self.snapshot, snapshot
+        if previous is None:
+            socketio.emit("sky_update", snapshot, namespace=NAMESPACE)
+            return
+
+        diff = {"julian_day": julian_day}
+        for field in ("positions", "gates"):
+            diff[field] = {
+                body: value for body, value in snapshot[field].items()
+                if previous[field].get(body) != value
+            }
+        socketio.emit("sky_update", diff, namespace=NAMESPACE)
+
+        # A transit entering a gate alerts everyone with that gate in their chart
+        for body, gate in diff["gates"].items():
+            socketio.emit("transit_alert", {"transit": body, "gate": gate}, to=_gate_room(gate), namespace=NAMESPACE)
+
+broadcaster = SkyBroadcaster()
+
+@socketio.on("connect", namespace=NAMESPACE)
+def connect():
+    if not session.get("logged_in"):
+        return False
+    broadcaster.start(current_app.config["LIVE_SKY_INTERVAL"])
+    # Late joiners get the last full snapshot; later ticks only send diffs
+    if broadcaster.snapshot is not None:
+        emit("sky_update", broadcaster.snapshot)
+
+@socketio.on("subscribe_alerts", namespace=NAMESPACE)
+def subscribe_alerts():
+    results = get_session_results() or {}
+    natal_positions = results.get("planet_positions")
+    if not natal_positions:
+        emit("alerts_error", {"error": "Calculate a chart first."})
+        return
+    gates = sorted({get_human_design_gate(degree) for degree in natal_positions.values()})
+    for gate in gates:
+        join_room(_gate_room(gate))
+    emit("alerts_subscribed", {"gates": gates})
+
+@socketio.on("unsubscribe_alerts", namespace=NAMESPACE)
+def unsubscribe_alerts():
+    for room in rooms():
+        if room.startswith("gate:"):
+            leave_room(room)
+    emit("alerts_unsubscribed", {})
\ No newline at end of file
@@ -0,0 +1,277 @@
+import argparse
+import json
+import logging
+import math
+import os
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from http.cookiejar import CookieJar
+from urllib.error import HTTPError, URLError
+from urllib.parse import urlencode, urljoin, urlparse
+from urllib.request import HTTPCookieProcessor, HTTPRedirectHandler, build_opener
+
+LOCAL_HOSTS = {"localhost", "127.0.0.1", "::1"}
+REPORT_VERSION = 1
+
+# (city, latitude, longitude)
+CITIES = [
+    ("Bucharest", 44.4268, 26.1025),
+    ("Beius", 46.6667, 22.5),
+    ("London", 51.5072, -0.1276),
+    ("New York", 40.7128, -74.006),
+    ("Sao Paulo", -23.5505, -46.6333),
+    ("Tokyo", 35.6762, 139.6503),
+    ("Sydney", -33.8688, 151.2093),
+    ("Mumbai", 19.076, 72.8777),
+    ("Cairo", 30.0444, 31.2357),
+    ("Reykjavik", 64.1466, -21.9426),
+]
+
+class NoRedirect(HTTPRedirectHandler):
+    """Surface redirects as responses so each hop is timed on its own route."""
+
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        return None
+
+def random_birth_form(rng):
+    """Build a random, valid /calculate form."""
+    city, latitude, longitude = rng.choice(CITIES)
+    dob = date(1940, 1, 1) + timedelta(days=rng.randrange((date(2010, 12, 31) - date(1940, 1, 1)).days))
+    return {
+        "city_coordinates": city,
+        "dob": dob.isoformat(),
+        "hour": f"{rng.randrange(24):02d}:{rng.randrange(60):02d}",
+        "latitude": latitude,
+        "longitude": longitude,
+    }
+
+class Recorder:
+    """Thread-safe collection of (route, latency, ok) samples."""
+
+    def __init__(self):
+        self.samples = {}
+        self.flows = []
+        self.failed_flows = 0
+        self._lock = threading.Lock()
+
+    def add(self, route, latency, ok):
+        with self._lock:
+            self.samples.setdefault(route, []).append((latency, ok))
+
+    def add_flow(self, latency, ok):
+        with self._lock:
+            if ok:
+                self.flows.append(latency)
+            else:
+                self.failed_flows += 1
+
+def _request(opener, recorder, route, url, data=None, expected=(200,)):
+    """Send one request, record its latency, and return (status, location)."""
+    body = urlencode(data).encode("utf-8") if data is not None else None
+    started = time.perf_counter()
+    try:
+        with opener.open(url, data=body, timeout=30) as response:
+            response.read()
+            status, location = response.status, response.headers.get("Location")
+    except HTTPError as e:
+        e.read()
+        status, location = e.code, e.headers.get("Location")
+    except (URLError, OSError):
+        status, location = None, None
+    recorder.add(route, time.perf_counter() - started, status in expected)
+    return status, location
+
+def run_flow(base_url, recorder, rng_seed, scheduled_at, stream=False):
+    """
+    Drive one user through /login, POST /calculate and the /results redirect.
+
+    With `stream`, the form is posted to /calculate/stream as the landing
+    page does: the streamed page is read to the end, then /results is
+    loaded from the results the stream cached. The flow latency is measured from the scheduled arrival time, so
+    queueing behind busy workers shows up in it instead of being hidden.
+    """
+    rng = random.Random(rng_seed)
+    opener = build_opener(HTTPCookieProcessor(CookieJar()), NoRedirect())
+
+    status, _ = _request(
+        opener, recorder, "POST /login", urljoin(base_url, "/login"),
+        {"email": "user", "password": "user"}, expected=(302,),
+    )
+    ok = status == 302
+    location = "/results"
+    if ok and stream:
+        status, _ = _request(
+            opener, recorder, "POST /calculate/stream", urljoin(base_url, "/calculate/stream"),
+            random_birth_form(rng),
+        )
+        ok = status == 200
+    elif ok:
+        status, location = _request(
+            opener, recorder, "POST /calculate", urljoin(base_url, "/calculate"),
+            random_birth_form(rng), expected=(302,),
+        )
+        ok = status == 302 and location is not None and urlparse(location).path == "/results"
+    if ok:
+        status, _ = _request(opener, recorder, "GET /results", urljoin(base_url, location))
+        ok = status == 200
+    recorder.add_flow(time.perf_counter() - scheduled_at, ok)
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+def summarize(latencies, errors=0):
+    """Latency percentiles (ms) and error rate for one series."""
+    latencies = sorted(latencies)
+    count = len(latencies) + errors
+
+    def ms(value):
+        return None if value is None else round(value * 1000, 2)
+
+    return {
+        "count": count,
+        "errors": errors,
+        "error_rate": round(errors / count, 4) if count else 0.0,
+        "p50_ms": ms(percentile(latencies, 0.50)),
+        "p95_ms": ms(percentile(latencies, 0.95)),
+        "p99_ms": ms(percentile(latencies, 0.99)),
+        "mean_ms": ms(sum(latencies) / len(latencies)) if latencies else None,
+        "max_ms": ms(latencies[-1]) if latencies else None,
+    }
+
+def run_load(base_url, concurrency, rate, duration, seed, stream=False):
+    """
+    Generate load for `duration` seconds.
+
+    With a positive `rate`, flows arrive as a Poisson process (open loop);
+    with rate 0 each of the `concurrency` workers runs flows back to back.
+    With `stream`, flows use /calculate/stream (see `run_flow`).
+
+    Returns:
+        tuple: (Recorder, elapsed seconds)
+    """
+    recorder = Recorder()
+    rng = random.Random(seed)
+    started = time.perf_counter()
+    deadline = started + duration
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        if rate > 0:
+            arrival = started
+            while True:
+                arrival += rng.expovariate(rate)
+                if arrival >= deadline:
+                    break
+                time.sleep(max(0.0, arrival - time.perf_counter()))
+                executor.submit(run_flow, base_url, recorder, rng.random(), arrival, stream)
+        else:
+            def closed_loop(worker_seed):
+                worker_rng = random.Random(worker_seed)
+                while time.perf_counter() < deadline:
+                    run_flow(base_url, recorder, worker_rng.random(), time.perf_counter(), stream)
+
+            for _ in range(concurrency):
+                executor.submit(closed_loop, rng.random())
+
+    return recorder, time.perf_counter() - started
+
+def build_report(recorder, elapsed, settings):
+    """Build the JSON report; the layout is stable so runs can be diffed."""
+    routes = {}
+    for route, samples in sorted(recorder.samples.items()):
+        latencies = [latency for latency, ok in samples if ok]
+        routes[route] = summarize(latencies, errors=len(samples) - len(latencies))
+
+    flow = summarize(recorder.flows, errors=recorder.failed_flows)
+    flow["throughput_per_s"] = round(len(recorder.flows) / elapsed, 2) if elapsed else 0.0
+    return {
+        "version": REPORT_VERSION,
+        "started": (datetime.now() - timedelta(seconds=elapsed)).isoformat(timespec="seconds"),
+        "elapsed_s": round(elapsed, 2),
+        "settings": settings,
+        "flow": flow,
+        "routes": routes,
+    }
+
+def start_local_app():
+    """
+    Start the app on a free localhost port in a background thread.
+
+    Uses an in-memory SQLite database unless DATABASE_URL is set.
+
+    Returns:
+        tuple: (base URL, server)
+    """
+    os.environ.setdefault("DATABASE_URL", "sqlite://")
+    from werkzeug.serving import make_server
+    from app import create_app
+
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)
+    server = make_server("127.0.0.1", 0, create_app(), threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_port}", server
+
+def print_summary(report):
+    print(f"{'route':<24}{'count':>8}{'err%':>8}{'p50':>10}{'p95':>10}{'p99':>10}", file=sys.stderr)
+    rows = list(report["routes"].items()) + [("flow", report["flow"])]
+    for name, stats in rows:
+        print(
+            f"{name:<24}{stats['count']:>8}{stats['error_rate'] * 100:>7.1f}%"
+            f"{stats['p50_ms'] or 0:>10.1f}{stats['p95_ms'] or 0:>10.1f}{stats['p99_ms'] or 0:>10.1f}",
+            file=sys.stderr,
+        )
+    print(f"throughput: {report['flow']['throughput_per_s']} flows/s", file=sys.stderr)
+
+if __name__ == "__main__":
+    # python -m app.load_test --concurrency 16 --rate 20 --duration 60 --output report.json
+    parser = argparse.ArgumentParser(description="Load test the login -> calculate -> results flow.")
+    parser.add_argument("--url", help="Base URL of a running app on localhost (default: start one locally).")
+    parser.add_argument("--concurrency", type=int, default=8, help="Maximum flows in progress at once.")
+    parser.add_argument("--rate", type=float, default=5.0, help="Flow arrivals per second (0 = closed loop).")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds of load.")
+    parser.add_argument("--seed", type=int, default=1, help="Seed for arrivals and inputs.")
+    parser.add_argument("--stream", action="store_true", help="Post to /calculate/stream, as the landing form does.")
+    parser.add_argument("--output", help="Write the JSON report here (default: stdout).")
+    args = parser.parse_args()
+
+    server = None
+    if args.url:
+        if urlparse(args.url).hostname not in LOCAL_HOSTS:
+            parser.error("--url must point at localhost")
+        base_url = args.url
+    else:
+        base_url, server = start_local_app()
+
+    # The calculation code prints debug output for every request
+    stdout = sys.stdout
+    sys.stdout = open(os.devnull, "w")
+    try:
+        recorder, elapsed = run_load(base_url, args.concurrency, args.rate, args.duration, args.seed, args.stream)
+    finally:
+        sys.stdout = stdout
+        if server is not None:
+            server.shutdown()
+
+    settings = {
+        "target": "local" if server is not None else base_url,
+        "concurrency": args.concurrency,
+        "rate": args.rate,
+        "duration_s": args.duration,
+        "seed": args.seed,
+        "stream": args.stream,
+    }
+    report = build_report(recorder, elapsed, settings)
+    print_summary(report)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2, sort_keys=True)
+    else:
+        print(json.dumps(report, indent=2, sort_keys=True))
\ No newline at end of file
@@ -0,0 +1,260 @@
+import cProfile
+import glob
+import hmac
+import json
+import os
+import pstats
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from functools import wraps
+
+from flask import current_app, make_response, request
+
+PROFILE_MODES = ("cprofile", "sampling")
+
+def is_admin_request():
+    """
+    Check the admin profiling token from the X-Profile-Token header or ?profile= query flag.
+
+    Returns:
+        bool: True only when profiling is enabled and the token matches.
+    """
+    config = current_app.config
+    token = config["PROFILING_TOKEN"]
+    if not config["PROFILING_ENABLED"] or not token:
+        return False
+    supplied = request.headers.get("X-Profile-Token") or request.args.get("profile") or ""
+    return hmac.compare_digest(supplied.encode("utf-8"), token.encode("utf-8"))
+
+def _frame_name(frame):
+    code = frame.f_code
+    module = frame.f_globals.get("__name__", os.path.basename(code.co_filename))
+    return f"{module}:{code.co_name}"
+
+class StackSampler:
+    """Sample one thread's Python stack at a fixed interval into collapsed-stack counts."""
+
+    def __init__(self, thread_id, interval):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            names = []
+            while frame is not None:
+                names.append(_frame_name(frame))
+                frame = frame.f_back
+            if names:
+                self.stacks[";".join(reversed(names))] += 1
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+def collapse_pstats(stats, max_depth=64):
+    """
+    Approximate collapsed stacks from a cProfile call graph.
+
+    cProfile records caller/callee edges rather than full stacks, so each
+    function's own time is split across call paths in proportion to the
+    time spent through each edge.
+
+    Args:
+        stats (pstats.Stats): Profile statistics.
+        max_depth (int): Maximum stack depth to expand.
+
+    Returns:
+        Counter: {"root;...;leaf": microseconds}
+    """
+    entries = stats.stats
+    children = {}
+    for function, (_, _, _, _, callers) in entries.items():
+        for caller, (_, _, _, edge_cumulative) in callers.items():
+            children.setdefault(caller, []).append((function, edge_cumulative))
+
+    def label(function):
+        filename, _, name = function
+        return f"{os.path.splitext(os.path.basename(filename))[0]}:{name}"
+
+    stacks = Counter()
+
+    def walk(function, path, share):
+        _, _, own_time, cumulative, _ = entries[function]
+        path = path + [label(function)]
+        if own_time * share > 0:
+            stacks[";".join(path)] += int(own_time * share * 1e6)
+        if len(path) >= max_depth:
+            return
+        for child, edge_cumulative in children.get(function, []):
+            child_cumulative = entries[child][3]
+            if child_cumulative > 0 and label(child) not in path:
+                walk(child, path, share * edge_cumulative / child_cumulative)
+
+    for function, (_, _, _, _, callers) in entries.items():
+        if not callers:
+            walk(function, [], 1.0)
+    return stacks
+
+def _write_collapsed(path, stacks):
+    with open(path, "w", encoding="utf-8") as file:
+        for stack, weight in stacks.most_common():
+            file.write(f"{stack} {weight}\n")
+
+def _prune(directory, keep):
+    profiles = sorted(glob.glob(os.path.join(directory, "*.json")), key=os.path.getmtime)
+    for metadata_path in profiles[:-keep] if keep else []:
+        base = os.path.splitext(metadata_path)[0]
+        for extension in (".json", ".collapsed", ".prof"):
+            if os.path.exists(base + extension):
+                os.remove(base + extension)
+
+class RequestProfile:
+    """
+    Profile of one request, recorded over one or more start/stop spans.
+
+    A streamed response keeps computing after its view returns, so its
+    profile is resumed while the stream is sent.
+    """
+
+    def __init__(self, mode, interval):
+        self.mode = mode
+        self.interval = interval
+        self.stacks = Counter()
+        self._profiler = cProfile.Profile() if mode == "cprofile" else None
+        self._sampler = None
+
+    def start(self):
+        if self._profiler is not None:
+            self._profiler.enable()
+        else:
+            self._sampler = StackSampler(threading.get_ident(), self.interval)
+            self._sampler.start()
+
+    def stop(self):
+        if self._profiler is not None:
+            self._profiler.disable()
+        else:
+            self._sampler.stop()
+            self.stacks.update(self._sampler.stacks)
+
+    def save(self, base):
+        """Write the .collapsed stacks (and .prof for cProfile) next to `base`."""
+        stacks = self.stacks
+        if self._profiler is not None:
+            self._profiler.dump_stats(base + ".prof")
+            stacks = collapse_pstats(pstats.Stats(self._profiler))
+        _write_collapsed(base + ".collapsed", stacks)
+
+def _profile_stream(chunks, profile, finish):
+    """Profile a streamed body until it is fully sent, then save the profile."""
+    profile.start()
+    try:
+        yield from chunks
+    finally:
+        profile.stop()
+        finish()
+
+def profiled(view):
+    """
+    Profile a view when an admin asks for it or the random sample rate hits.
+
+    Profiles are saved under PROFILING_DIR with a request ID, which is
+    returned in the X-Profile-Id response header. A streamed response is
+    profiled until its last chunk is sent. Requests that are not profiled
+    run the view directly.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        config = current_app.config
+        if not config["PROFILING_ENABLED"]:
+            return view(*args, **kwargs)
+
+        if is_admin_request():
+            reason = "admin"
+            mode = request.headers.get("X-Profile-Mode") or config["PROFILING_MODE"]
+        elif random.random() < config["PROFILING_SAMPLE_RATE"]:
+            reason = "sampled"
+            mode = config["PROFILING_MODE"]
+        else:
+            return view(*args, **kwargs)
+        if mode not in PROFILE_MODES:
+            mode = config["PROFILING_MODE"]
+
+        profile_id = uuid.uuid4().hex
+        directory = config["PROFILING_DIR"]
+        keep = config["PROFILING_KEEP"]
+        os.makedirs(directory, exist_ok=True)
+        base = os.path.join(directory, profile_id)
+
+        profile = RequestProfile(mode, config["PROFILING_INTERVAL_MS"] / 1000)
+        started = time.time()
+        profile.start()
+        try:
+            response = make_response(view(*args, **kwargs))
+        finally:
+            profile.stop()
+        metadata = {
+            "id": profile_id,
+            "method": request.method,
+            "path": request.path,
+            "mode": mode,
+            "reason": reason,
+            "started": started,
+            "streamed": response.is_streamed,
+        }
+
+        # Called once the body is sent, which for a stream is after the view returned
+        def finish():
+            profile.save(base)
+            metadata["duration_ms"] = round((time.time() - started) * 1000, 1)
+            metadata["status"] = response.status_code
+            with open(base + ".json", "w", encoding="utf-8") as file:
+                json.dump(metadata, file)
+            _prune(directory, keep)
+
+        if response.is_streamed:
+            response.response = _profile_stream(response.response, profile, finish)
+        else:
+            finish()
+
+        response.headers["X-Profile-Id"] = profile_id
+        return response
+
+    return wrapper
+
+def list_profiles(directory, limit=50):
+    """Return metadata of the most recent profiles, newest first."""
+    profiles = []
+    paths = sorted(glob.glob(os.path.join(directory, "*.json")), key=os.path.getmtime, reverse=True)
+    for metadata_path in paths[:limit]:
+        with open(metadata_path, "r", encoding="utf-8") as file:
+            profiles.append(json.load(file))
+    return profiles
+
+def get_profile_path(directory, profile_id, extension):
+    """
+    Return the path of a stored profile file, or None.
+
+    Args:
+        directory (str): Profile directory.
+        profile_id (str): Request ID of the profile.
+        extension (str): ".json", ".collapsed" or ".prof".
+    """
+    try:
+        if uuid.UUID(hex=profile_id).hex != profile_id:
+            return None
+    except ValueError:
+        return None
+    path = os.path.join(directory, profile_id + extension)
+    return path if os.path.exists(path) else None
\ No newline at end of file
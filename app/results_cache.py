@@ -0,0 +1,101 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+# Bump when the session results layout changes so old entries are not reused
+RESULTS_VERSION = 2
+
+class ChartResultsCache:
+    """
+    Session results of computed charts keyed by a hash of their inputs, in memory and on disk.
+
+    A streamed chart is computed after its cookie is sent, so the stream
+    stores its results here and the next request rebuilds the session from
+    them on any worker process instead of computing the chart again.
+
+    Entries hold birth details, so they are removed once used (`pop`), and
+    entries never used (e.g. the tab was closed) are deleted after `max_age`
+    seconds by a sweep that runs at most every `sweep_interval` seconds.
+    """
+
+    def __init__(self, directory, max_age=3600, max_entries=512, sweep_interval=600):
+        self.directory = directory
+        self.max_age = max_age
+        self.max_entries = max_entries
+        self.sweep_interval = sweep_interval
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._next_sweep = 0
+
+    @staticmethod
+    def inputs_key(inputs):
+        payload = json.dumps([RESULTS_VERSION, inputs], sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def _remember(self, key, results):
+        with self._lock:
+            self._memory[key] = results
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    def _sweep(self):
+        # Delete entries older than max_age; cheap enough to run from put()
+        now = time.time()
+        with self._lock:
+            if now < self._next_sweep:
+                return
+            self._next_sweep = now + self.sweep_interval
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return
+        for name in names:
+            path = os.path.join(self.directory, name)
+            try:
+                if now - os.path.getmtime(path) > self.max_age:
+                    os.remove(path)
+            except FileNotFoundError:
+                pass  # Popped or swept by another process
+
+    def pop(self, inputs):
+        """Return and delete the cached results for chart inputs, or None."""
+        key = self.inputs_key(inputs)
+        with self._lock:
+            results = self._memory.pop(key, None)
+        try:
+            if results is None:
+                with open(self._path(key), "r", encoding="utf-8") as file:
+                    results = json.load(file)
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+        except ValueError:
+            return None
+        return results
+
+    def put(self, inputs, results):
+        """Store the results computed for chart inputs."""
+        key = self.inputs_key(inputs)
+        self._remember(key, results)
+        os.makedirs(self.directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as file:
+            json.dump(results, file)
+        os.replace(tmp_path, self._path(key))
+        self._sweep()
+
+_caches = {}
+
+def get_results_cache(directory, max_age=3600):
+    """Return the shared results cache for a directory."""
+    if directory not in _caches:
+        _caches[directory] = ChartResultsCache(directory, max_age)
+    return _caches[directory]
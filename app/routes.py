@@ -1,67 +1,139 @@
-from flask import Flask, Blueprint, render_template, request, redirect, url_for, jsonify, session
+from flask import Flask, Blueprint, render_template, request, redirect, url_for, jsonify, session, current_app, abort, Response, send_file, stream_with_context
 from datetime import datetime
 from app.astrology import *
 from app.human_design import *
-# from app.ai_description import generate_local_description
+from app.ephemeris import get_tier_metrics, resolve_tier
+from app.chart_svg import get_render_cache, render_chart_svgs
+from app.results_cache import get_results_cache
+from app.profiling import get_profile_path, is_admin_request, list_profiles, profiled
+from app.birth_time import calculate_birth_time_ranges
+from app.transits import load_transit_table, transit_overlay
+# from app.description_store import get_description
 
 main = Blueprint("main", __name__)
 app = Flask(__name__)
 app.secret_key = "1qaz"
 
+STREAM_MARKER = "<!--stream-sections-->"
+
+def read_chart_form():
+    """
+    Read the birth details posted by the landing form.
+
+    Returns:
+        dict: The inputs (latitude and longitude as floats, tier resolved), or None if any is missing.
+    """
+    inputs = {
+        "city": request.form.get("city_coordinates"),
+        "dob": request.form.get("dob"),
+        "hour": request.form.get("hour"),
+        "latitude": request.form.get("latitude"),
+        "longitude": request.form.get("longitude"),
+    }
+    print(f"Received data: city_coordinates={inputs['city']}, dob={inputs['dob']}, hour={inputs['hour']}, latitude={inputs['latitude']}, longitude={inputs['longitude']}")
+    if not all(inputs.values()):
+        return None
+    inputs["latitude"] = float(inputs["latitude"])
+    inputs["longitude"] = float(inputs["longitude"])
+    inputs["tier"] = resolve_tier(request.form.get("tier"))
+    return inputs
+
+def astrology_fields(astrology_details):
+    """Flatten astrology details into the fields the results page shows."""
+    return {
+        "element": astrology_details["element"],
+        "sun_sign": astrology_details["sun_sign"],
+        "sun_position_dms": astrology_details["sun_position_dms"],
+        "rising_sign": astrology_details["rising_sign"],
+        "ascendant_position_dms": astrology_details["ascendant_position_dms"],
+        "ruling_planet": astrology_details["ruling_planet"],
+        "sun_house_title": astrology_details["sun_house"]["title"],
+        "sun_house_description": astrology_details["sun_house"]["description"],
+        "sun_house_degree": astrology_details["sun_house"]["degree"],
+        "ascendant_house_title": astrology_details["ascendant_house"]["title"],
+        "ascendant_house_description": astrology_details["ascendant_house"]["description"],
+        "ascendant_house_degree": astrology_details["ascendant_house"]["degree"],
+    }
+
+def build_session_results(inputs, astrology_details, human_design_details, chart_svgs):
+    """Flatten a computed chart into the fields kept in the session for the results page."""
+    return {
+        "city": inputs["city"],
+        "dob": inputs["dob"],
+        "hour": inputs["hour"],
+        "latitude": inputs["latitude"],
+        "longitude": inputs["longitude"],
+        #Astrology fields
+        **astrology_fields(astrology_details),
+        # Human Design fields
+        "type": human_design_details["Type"],
+        "strategy": human_design_details["Strategy"],
+        "not_self_theme": human_design_details["Not-Self Theme"],
+        "signature": human_design_details["Signature"],
+        "definition": human_design_details["Definition"],
+        "authority": human_design_details["Authority"],
+        "profile": human_design_details["Profile"],
+        "incarnation_cross": human_design_details["Incarnation Cross"],
+        # Chart SVG cache keys
+        "wheel_svg": chart_svgs["wheel"],
+        "bodygraph_svg": chart_svgs["bodygraph"],
+        # Natal positions for the transit overlay
+        "planet_positions": human_design_details["Planetary Positions"],
+    }
+
+def compute_session_results(inputs):
+    """Compute a chart from `read_chart_form` inputs and flatten it for the session."""
+    astrology_details = calculate_astrology_details(inputs["dob"], inputs["hour"], inputs["latitude"], inputs["longitude"], inputs["tier"])
+    human_design_details = calculate_human_design(inputs["dob"], inputs["hour"], inputs["latitude"], inputs["longitude"], inputs["tier"])
+    print(human_design_details)
+
+    # Render (or reuse) the chart SVGs
+    chart_svgs = render_chart_svgs(
+        get_render_cache(current_app.config["SVG_CACHE_DIR"], current_app.config["SVG_CACHE_MAX_AGE"]),
+        astrology_details,
+        human_design_details,
+    )
+    return build_session_results(inputs, astrology_details, human_design_details, chart_svgs)
+
+def get_session_results():
+    """
+    Return the session's results, rebuilding those of a streamed chart first.
+
+    A streamed response sends its cookie before the chart is computed, so the
+    session keeps the chart's inputs instead. The stream stores the results
+    it computed in the shared results cache, so the next request that needs
+    them (on any worker process) takes them from there and deletes the
+    entry; the chart is only recomputed if the stream did not complete.
+    Every reader of the session's results goes through here.
+    """
+    inputs = session.pop("chart_inputs", None)
+    if inputs is not None:
+        results = get_results_cache(current_app.config["RESULTS_CACHE_DIR"], current_app.config["RESULTS_CACHE_MAX_AGE"]).pop(inputs)
+        if results is None:
+            try:
+                results = compute_session_results(inputs)
+            except ValueError as e:
+                print(f"Error rebuilding streamed chart: {e}")
+        if results is not None:
+            session["results"] = results
+    return session.get("results")
+
 @main.route("/calculate", methods=["POST"])
+@profiled
 def calculate():
     try:
         # Get form inputs
-        city_coordinates = request.form.get("city_coordinates")
-        dob = request.form.get("dob")
-        hour = request.form.get("hour")
-        latitude = request.form.get("latitude")
-        longitude = request.form.get("longitude")
-
-        print(f"Received data: city_coordinates={city_coordinates}, dob={dob}, hour={hour}, latitude={latitude}, longitude={longitude}")
+        inputs = read_chart_form()
 
         # Check for missing data
-        if not all([city_coordinates, dob, hour, latitude, longitude]):
+        if inputs is None:
             print("Error: Missing required form data.")
             return "Error: Missing required form data.", 400
 
-        # Perform calculation
-        latitude = float(latitude)
-        longitude = float(longitude)
-        astrology_details = calculate_astrology_details(dob, hour, latitude, longitude)
-        human_design_details = calculate_human_design(dob,hour, latitude, longitude)
-        print(human_design_details)
-
-        # Store results in session
-        session["results"] = {
-            "city": city_coordinates,
-            "dob": dob,
-            "hour": hour,
-            "latitude": latitude,
-            "longitude": longitude,
-            #Astrology fields
-            "element": astrology_details["element"],
-            "sun_sign": astrology_details["sun_sign"],
-            "sun_position_dms": astrology_details["sun_position_dms"],
-            "rising_sign": astrology_details["rising_sign"],
-            "ascendant_position_dms": astrology_details["ascendant_position_dms"],
-            "ruling_planet": astrology_details["ruling_planet"],
-            "sun_house_title": astrology_details["sun_house"]["title"],
-    		"sun_house_description": astrology_details["sun_house"]["description"],
-    		"sun_house_degree": astrology_details["sun_house"]["degree"],
-    		"ascendant_house_title": astrology_details["ascendant_house"]["title"],
-    		"ascendant_house_description": astrology_details["ascendant_house"]["description"],
-    		"ascendant_house_degree": astrology_details["ascendant_house"]["degree"],
-            # Human Design fields
-            "type": human_design_details["Type"],
-            "strategy": human_design_details["Strategy"],
-            "not_self_theme": human_design_details["Not-Self Theme"],
-            "signature": human_design_details["Signature"],
-            "definition": human_design_details["Definition"],
-            "authority": human_design_details["Authority"],
-            "profile": human_design_details["Profile"],
-            "incarnation_cross": human_design_details["Incarnation Cross"],
-        }
+        # Perform calculation and store results in session
+        session["results"] = compute_session_results(inputs)
+        # This chart replaces any streamed one still waiting to be rebuilt
+        session.pop("chart_inputs", None)
 
         # Redirect to results
         print("Redirecting to /results")
@@ -71,16 +143,87 @@ def calculate():
         return render_template("error.html", message=f"An error occurred: {e}")
     except Exception as e:
         return f"Unexpected error: {e}", 500
-    
+
+@main.route("/calculate/stream", methods=["POST"])
+@profiled
+def calculate_stream():
+    """
+    Calculate a chart and stream the results page as it is computed.
+
+    The page shell is sent at once; the astrology cards and then the chart
+    images are flushed into their placeholders as each part is computed. The
+    cookie is sent with the shell, so the session keeps the chart's inputs and
+    the computed results go to the shared results cache, where the next
+    request that needs them finds them (see `get_session_results`).
+    """
+    try:
+        inputs = read_chart_form()
+    except ValueError as e:
+        return render_template("error.html", message=f"An error occurred: {e}")
+    if inputs is None:
+        return "Error: Missing required form data.", 400
+
+    session.pop("results", None)
+    session["chart_inputs"] = inputs
+
+    svg_cache = get_render_cache(current_app.config["SVG_CACHE_DIR"], current_app.config["SVG_CACHE_MAX_AGE"])
+    results_cache = get_results_cache(current_app.config["RESULTS_CACHE_DIR"], current_app.config["RESULTS_CACHE_MAX_AGE"])
+    shell = render_template("results_stream.html", city=inputs["city"], dob=inputs["dob"], hour=inputs["hour"])
+    head, tail = shell.split(STREAM_MARKER)
+
+    def section(name, context=None, error=None):
+        return render_template("results_section.html", name=name, error=error, **(context or {}))
+
+    @stream_with_context
+    def generate():
+        yield head
+        pending_sections = ["astrology", "charts"]
+        try:
+            astrology_details = calculate_astrology_details(inputs["dob"], inputs["hour"], inputs["latitude"], inputs["longitude"], inputs["tier"])
+            pending_sections.remove("astrology")
+            yield section("astrology", {
+                "city": inputs["city"], "dob": inputs["dob"], "hour": inputs["hour"],
+                **astrology_fields(astrology_details),
+            })
+
+            human_design_details = calculate_human_design(inputs["dob"], inputs["hour"], inputs["latitude"], inputs["longitude"], inputs["tier"])
+            chart_svgs = render_chart_svgs(svg_cache, astrology_details, human_design_details)
+            pending_sections.remove("charts")
+            # Stored before the page ends, so the next request never recomputes it
+            results_cache.put(inputs, build_session_results(inputs, astrology_details, human_design_details, chart_svgs))
+            yield section("charts", {"wheel_svg": chart_svgs["wheel"], "bodygraph_svg": chart_svgs["bodygraph"]})
+        except ValueError as e:
+            # Show the error in the first section still waiting
+            yield section(pending_sections[0], error=e)
+        yield tail
+
+    response = Response(generate(), mimetype="text/html")
+    response.headers["X-Accel-Buffering"] = "no"  # Let proxies pass each section through
+    return response
+
+@main.route("/calculate/unknown-time", methods=["POST"])
+def calculate_unknown_time():
+    # Every distinct outcome across the birth date, for users without a birth time
+    dob = request.form.get("dob")
+    latitude = request.form.get("latitude")
+    longitude = request.form.get("longitude")
+    if not all([dob, latitude, longitude]):
+        return jsonify({"error": "Missing required form data."}), 400
+    try:
+        tier = resolve_tier(request.form.get("tier"))
+        return jsonify(calculate_birth_time_ranges(dob, float(latitude), float(longitude), tier))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
 @main.route("/results", methods=["GET"])
 def results():
-    if "results" not in session:
+    results = get_session_results()  # Retrieve results from session without popping
+    if results is None:
         print("No results in session. Redirecting to home.")
         return redirect(url_for("main.home"))
 
-    results = session["results"]  # Retrieve results from session without popping
     
-    # description = generate_local_description(sun_sign, rising_sign)
+    # description = get_description(results["sun_sign"], results["rising_sign"])
     # print(description)
     
     return render_template(
@@ -108,8 +251,64 @@ def results():
 		authority=results.get("authority", "Unknown"),
 		profile=results.get("profile", "Unknown"),
 		incarnation_cross=results.get("incarnation_cross", "Unknown"),
+		wheel_svg=results.get("wheel_svg"),
+		bodygraph_svg=results.get("bodygraph_svg"),
 )
     
+@main.route("/charts/<key>.svg", methods=["GET"])
+def chart_svg(key):
+    # Keys are content hashes, so a response never changes once served
+    if len(key) != 64 or not all(c in "0123456789abcdef" for c in key):
+        abort(404)
+    svg = get_render_cache(current_app.config["SVG_CACHE_DIR"], current_app.config["SVG_CACHE_MAX_AGE"]).get(key)
+    if svg is None:
+        abort(404)
+    response = Response(svg, mimetype="image/svg+xml")
+    response.headers["Cache-Control"] = "private, max-age=31536000, immutable"
+    response.set_etag(key)
+    return response
+
+@main.route("/transits", methods=["GET"])
+def transits():
+    results = get_session_results()
+    if not results or "planet_positions" not in results:
+        return jsonify({"error": "Calculate a chart first."}), 404
+    try:
+        table = load_transit_table(current_app.config["TRANSIT_TABLE_PATH"])
+        return jsonify(transit_overlay(table, results["planet_positions"]))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 503
+
+@main.route("/profiles", methods=["GET"])
+def profiles():
+    if not is_admin_request():
+        abort(404)
+    return jsonify(list_profiles(current_app.config["PROFILING_DIR"], request.args.get("limit", 50, type=int)))
+
+@main.route("/profiles/<profile_id>", methods=["GET"])
+def profile(profile_id):
+    if not is_admin_request():
+        abort(404)
+    directory = current_app.config["PROFILING_DIR"]
+    metadata_path = get_profile_path(directory, profile_id, ".json")
+    collapsed_path = get_profile_path(directory, profile_id, ".collapsed")
+    if metadata_path is None or collapsed_path is None:
+        abort(404)
+
+    # ?format=collapsed returns flamegraph.pl / speedscope input
+    if request.args.get("format") == "collapsed":
+        return send_file(collapsed_path, mimetype="text/plain")
+    if request.args.get("format") == "pstats":
+        pstats_path = get_profile_path(directory, profile_id, ".prof")
+        if pstats_path is None:
+            abort(404)
+        return send_file(pstats_path, mimetype="application/octet-stream", as_attachment=True)
+    return send_file(metadata_path, mimetype="application/json")
+
+@main.route("/metrics/ephemeris", methods=["GET"])
+def ephemeris_metrics():
+    return jsonify(get_tier_metrics())
+
 @main.route("/")
 def index():
     return redirect(url_for("main.login"))
@@ -137,7 +336,7 @@ def logout():
 @main.before_app_request
 def require_login():
     # List routes that do not require authentication
-    allowed_routes = ["main.login", "main.index"]
+    allowed_routes = ["main.login", "main.index", "main.profiles", "main.profile"]  # Profiles check their own admin token
     if "logged_in" not in session and request.endpoint not in allowed_routes:
         return redirect(url_for("main.login"))
     
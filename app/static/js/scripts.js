@@ -259,29 +259,20 @@ document.addEventListener("DOMContentLoaded", async () => {
     const dob = formData.get("dob");
     formData.set("dob", convertDateToISO(dob));
 
-    try {
-      const response = await fetch("/calculate", {
-        method: "POST",
-        body: formData,
-      });
-
-      if (response.redirected) {
-        // Redirect to the new page
-        window.location.href = response.url;
-      } else if (response.ok) {
-        // Fallback for successful HTML rendering
-        const resultHtml = await response.text();
-        document.body.innerHTML = resultHtml;
-      } else {
-        // Log error response
-        const errorMessage = await response.text();
-        console.error("Error:", errorMessage);
-      }
-    } catch (error) {
-      console.error("Error submitting form:", error);
-    } finally {
-      isSubmitting = false; // Reset submission flag
+    // Navigate to the streamed results page, which paints each card section as soon as it is calculated
+    const streamForm = document.createElement("form");
+    streamForm.method = "POST";
+    streamForm.action = "/calculate/stream";
+    streamForm.style.display = "none";
+    for (const [name, value] of formData.entries()) {
+      const input = document.createElement("input");
+      input.type = "hidden";
+      input.name = name;
+      input.value = value;
+      streamForm.appendChild(input);
     }
+    document.body.appendChild(streamForm);
+    streamForm.submit();
   });
 
   let modalActive = false;
@@ -1,38 +1,218 @@
-from transformers import GPT2LMHeadModel, GPT2Tokenizer, Trainer, TrainingArguments
-from datasets import load_dataset
+import argparse
+import inspect
+import time
+
+from transformers import (
+    GPT2LMHeadModel,
+    GPT2Tokenizer,
+    Trainer,
+    TrainingArguments,
+)
+from datasets import Dataset, load_dataset
 
 model_name = "distilgpt2"
 tokenizer = GPT2Tokenizer.from_pretrained(model_name)
 model = GPT2LMHeadModel.from_pretrained(model_name)
 
-# Load your custom dataset
-dataset = load_dataset("path/to/dataset")
-
 def tokenize_function(examples):
     return tokenizer(examples["text"], truncation=True, padding="max_length", max_length=512)
 
-tokenized_dataset = dataset.map(tokenize_function, batched=True)
+def tokenized_examples(dataset_path, split, tokenizer_name, block_size, pack, chunk_size):
+    """
+    Stream a dataset split and yield tokenized training examples.
 
-# Define training arguments
-training_args = TrainingArguments(
-    output_dir="./results",
-    num_train_epochs=3,
-    per_device_train_batch_size=4,
-    save_steps=10_000,
-    save_total_limit=2,
-)
+    Texts are read and tokenized `chunk_size` at a time, so the raw dataset
+    never has to fit in memory.
 
-# Define the trainer
-trainer = Trainer(
-    model=model,
-    args=training_args,
-    train_dataset=tokenized_dataset["train"],
-    eval_dataset=tokenized_dataset["validation"],
-)
+    Args:
+        dataset_path (str): Path or name passed to `load_dataset`.
+        split (str): Dataset split (e.g., "train").
+        tokenizer_name (str): Tokenizer to load (kept as a name so the generator can be cached).
+        block_size (int): Context length of the model.
+        pack (bool): Concatenate texts (EOS-separated) into full `block_size` blocks.
+        chunk_size (int): Number of texts tokenized per call.
+
+    Yields:
+        dict: {"input_ids": list of token ids, "length": number of tokens}
+    """
+    chunk_tokenizer = GPT2Tokenizer.from_pretrained(tokenizer_name)
+    eos = chunk_tokenizer.eos_token_id
+    stream = load_dataset(dataset_path, split=split, streaming=True)
+
+    buffer = []
+    for batch in stream.iter(batch_size=chunk_size):
+        for ids in chunk_tokenizer(batch["text"], add_special_tokens=False)["input_ids"]:
+            if not pack:
+                ids = ids[:block_size]
+                yield {"input_ids": ids, "length": len(ids)}
+                continue
+
+            buffer.extend(ids)
+            buffer.append(eos)
+            if len(buffer) >= block_size:
+                full = len(buffer) - len(buffer) % block_size
+                for start in range(0, full, block_size):
+                    yield {"input_ids": buffer[start:start + block_size], "length": block_size}
+                buffer = buffer[full:]
+
+    # The final partial block is kept and padded dynamically by the collator
+    if buffer:
+        yield {"input_ids": buffer, "length": len(buffer)}
+
+def build_cached_dataset(dataset_path, split, block_size, pack, chunk_size=1000, cache_dir=None):
+    """
+    Tokenize a split once into cached Arrow shards.
+
+    `Dataset.from_generator` writes the examples to disk as they are
+    produced and fingerprints the arguments, so later runs with the same
+    dataset, tokenizer and block size reuse the shards without tokenizing.
+
+    Returns:
+        Dataset: Tokenized examples with a "length" column.
+    """
+    return Dataset.from_generator(
+        tokenized_examples,
+        gen_kwargs={
+            "dataset_path": dataset_path,
+            "split": split,
+            "tokenizer_name": model_name,
+            "block_size": block_size,
+            "pack": pack,
+            "chunk_size": chunk_size,
+        },
+        cache_dir=cache_dir,
+    )
+
+def collate_causal_lm(features):
+    """
+    Pad a batch to its longest example and build causal LM labels.
+
+    Labels copy the input IDs with padding set to -100, found by the
+    attention mask rather than by token ID: the pad token is EOS, and the EOS
+    separators between packed texts must stay in the loss so the model
+    learns where a description ends.
+    """
+    batch = tokenizer.pad([{"input_ids": feature["input_ids"]} for feature in features], return_tensors="pt")
+    labels = batch["input_ids"].clone()
+    labels[batch["attention_mask"] == 0] = -100
+    batch["labels"] = labels
+    return batch
+
+def group_by_length_args():
+    """TrainingArguments keywords that batch examples of similar length (renamed in transformers 5)."""
+    if "train_sampling_strategy" in inspect.signature(TrainingArguments.__init__).parameters:
+        return {"train_sampling_strategy": "group_by_length"}
+    return {"group_by_length": True}
+
+class TokenThroughputTrainer(Trainer):
+    """Trainer that counts real (non-padding) tokens and logs tokens/sec."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.tokens_seen = 0
+        self.train_start = None
+
+    def training_step(self, model, inputs, *args, **kwargs):
+        if self.train_start is None:
+            self.train_start = time.perf_counter()
+        self.tokens_seen += int(inputs["attention_mask"].sum())
+        return super().training_step(model, inputs, *args, **kwargs)
+
+    def log(self, logs, *args, **kwargs):
+        if self.train_start is not None:
+            elapsed = time.perf_counter() - self.train_start
+            logs["tokens_seen"] = self.tokens_seen
+            logs["tokens_per_sec"] = round(self.tokens_seen / elapsed, 1) if elapsed else 0.0
+        super().log(logs, *args, **kwargs)
+
+def train_standard(dataset_path):
+    """Original pipeline: eager tokenization, padding every example to 512 tokens."""
+    # Load your custom dataset
+    dataset = load_dataset(dataset_path)
+
+    tokenized_dataset = dataset.map(tokenize_function, batched=True)
+
+    # Define training arguments
+    training_args = TrainingArguments(
+        output_dir="./results",
+        num_train_epochs=3,
+        per_device_train_batch_size=4,
+        save_steps=10_000,
+        save_total_limit=2,
+    )
+
+    # Define the trainer
+    trainer = Trainer(
+        model=model,
+        args=training_args,
+        train_dataset=tokenized_dataset["train"],
+        eval_dataset=tokenized_dataset["validation"],
+    )
+
+    # Fine-tune the model
+    trainer.train()
+
+def train_fast(dataset_path, block_size, batch_size, gradient_accumulation_steps, epochs, cache_dir, workers, pack=True):
+    """
+    High-throughput pipeline for CPU-only fine-tuning.
+
+    Training texts are streamed, tokenized once into cached shards and, by
+    default, packed into full context-length blocks. Unpacked examples are
+    batched by similar length and padded per batch to their longest member,
+    so almost no compute goes to padding tokens either way.
+    """
+    tokenizer.pad_token = tokenizer.eos_token
+
+    train_dataset = build_cached_dataset(dataset_path, "train", block_size, pack=pack, cache_dir=cache_dir)
+    eval_dataset = build_cached_dataset(dataset_path, "validation", block_size, pack=False, cache_dir=cache_dir)
+
+    training_args = TrainingArguments(
+        output_dir="./results",
+        num_train_epochs=epochs,
+        per_device_train_batch_size=batch_size,
+        per_device_eval_batch_size=batch_size,
+        gradient_accumulation_steps=gradient_accumulation_steps,
+        length_column_name="length",
+        dataloader_num_workers=workers,
+        logging_steps=10,
+        save_steps=10_000,
+        save_total_limit=2,
+        **group_by_length_args(),
+    )
+
+    trainer = TokenThroughputTrainer(
+        model=model,
+        args=training_args,
+        train_dataset=train_dataset,
+        eval_dataset=eval_dataset,
+        # Pads each batch to its own longest sequence
+        data_collator=collate_causal_lm,
+    )
+
+    trainer.train()
+    print(f"Trained on {trainer.tokens_seen} tokens")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fine-tune distilgpt2 on a custom dataset.")
+    parser.add_argument("dataset", nargs="?", default="path/to/dataset")
+    parser.add_argument("--mode", choices=["standard", "fast"], default="standard")
+    parser.add_argument("--block-size", type=int, default=model.config.n_positions)
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--gradient-accumulation-steps", type=int, default=4)
+    parser.add_argument("--epochs", type=float, default=3)
+    parser.add_argument("--cache-dir", default=None)
+    parser.add_argument("--workers", type=int, default=0)
+    parser.add_argument("--no-packing", dest="pack", action="store_false")
+    args = parser.parse_args()
 
-# Fine-tune the model
-trainer.train()
+    if args.mode == "fast":
+        train_fast(
+            args.dataset, args.block_size, args.batch_size, args.gradient_accumulation_steps,
+            args.epochs, args.cache_dir, args.workers, args.pack,
+        )
+    else:
+        train_standard(args.dataset)
 
-# Save the model
-model.save_pretrained("./fine_tuned_distilgpt2")
-tokenizer.save_pretrained("./fine_tuned_distilgpt2")
\ No newline at end of file
+    # Save the model
+    model.save_pretrained("./fine_tuned_distilgpt2")
+    tokenizer.save_pretrained("./fine_tuned_distilgpt2")
\ No newline at end of file
@@ -0,0 +1,173 @@
+import os
+from datetime import datetime, timedelta
+
+import click
+import numpy as np
+import swisseph as swe
+from flask import current_app
+from flask.cli import AppGroup
+
+from app.ephemeris import resolve_tier
+from app.human_design import PLANETS, calculate_planetary_positions
+
+transits_cli = AppGroup("transits", help="Daily transit feed.")
+
+# Bodies stored in the table, in column order (Earth is derived from the Sun)
+TRANSIT_BODIES = PLANETS + ["EARTH"]
+
+# Aspect name: (angle, orb) in degrees
+ASPECTS = {
+    "Conjunction": (0, 8),
+    "Sextile": (60, 4),
+    "Square": (90, 6),
+    "Trine": (120, 6),
+    "Opposition": (180, 8),
+}
+
+GATE_SIZE = 360 / 64
+
+def gates_for(longitudes):
+    """Vectorized `get_human_design_gate`: Human Design gate (1-64) for each longitude."""
+    return (np.asarray(longitudes) // GATE_SIZE).astype(np.uint8) + 1
+
+def julian_day_for(moment):
+    """Julian day (UT) for a naive UTC datetime."""
+    return swe.julday(moment.year, moment.month, moment.day, moment.hour + moment.minute / 60)
+
+def build_transit_table(start, days=30, step_hours=1, tier=None):
+    """
+    Precompute transit positions for a rolling window.
+
+    Args:
+        start (datetime): First instant of the window (naive, UTC).
+        days (int): Length of the window in days.
+        step_hours (float): Spacing between rows.
+        tier (str): Ephemeris precision tier.
+
+    Returns:
+        dict: "julian_days" (float64, rows), "longitudes" (float32, rows x bodies)
+            and "gates" (uint8, rows x bodies), columns in TRANSIT_BODIES order.
+    """
+    tier = resolve_tier(tier)
+    rows = int(days * 24 / step_hours) + 1
+    start_day = julian_day_for(start)
+    julian_days = start_day + np.arange(rows) * (step_hours / 24)
+
+    longitudes = np.empty((rows, len(TRANSIT_BODIES)), dtype=np.float32)
+    for row, julian_day in enumerate(julian_days):
+        positions = calculate_planetary_positions(float(julian_day), tier)
+        longitudes[row] = [positions[body] for body in TRANSIT_BODIES]
+
+    return {
+        "julian_days": julian_days,
+        "longitudes": longitudes,
+        "gates": gates_for(longitudes),
+    }
+
+def save_transit_table(path, table):
+    """Write a transit table to an .npz file (atomically replacing the old one)."""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp.npz"
+    np.savez(tmp_path, **table)
+    os.replace(tmp_path, path)
+
+_loaded = {}
+
+def load_transit_table(path):
+    """
+    Load a transit table, reusing the in-memory copy until the file changes.
+
+    Raises:
+        ValueError: If the table has not been built.
+    """
+    try:
+        modified = os.path.getmtime(path)
+    except OSError:
+        raise ValueError(f"Transit table not found at {path}; run `flask transits build`")
+    cached = _loaded.get(path)
+    if cached is None or cached[0] != modified:
+        with np.load(path) as data:
+            cached = (modified, {name: data[name] for name in data.files})
+        _loaded[path] = cached
+    return cached[1]
+
+def transit_longitudes(table, julian_day):
+    """
+    Transit longitudes at an instant, interpolated between the two nearest rows.
+
+    Raises:
+        ValueError: If the instant is outside the table's window.
+    """
+    julian_days = table["julian_days"]
+    if not julian_days[0] <= julian_day <= julian_days[-1]:
+        raise ValueError("Requested time is outside the precomputed transit window")
+
+    row = min(int(np.searchsorted(julian_days, julian_day, side="right")) - 1, len(julian_days) - 2)
+    fraction = (julian_day - julian_days[row]) / (julian_days[row + 1] - julian_days[row])
+    before = table["longitudes"][row].astype(np.float64)
+    after = table["longitudes"][row + 1].astype(np.float64)
+    # Interpolate along the shorter arc so 359° -> 1° does not sweep backwards
+    delta = (after - before + 180) % 360 - 180
+    return (before + fraction * delta) % 360
+
+def transit_overlay(table, natal_positions, julian_day=None):
+    """
+    Combine the shared transit table with one user's natal positions.
+
+    Args:
+        table (dict): Transit table from `build_transit_table` / `load_transit_table`.
+        natal_positions (dict): Natal positions (degrees) keyed by planet,
+            as returned by `calculate_planetary_positions`.
+        julian_day (float): Instant to evaluate (defaults to now).
+
+    Returns:
+        dict: Transit aspects to natal planets, the transit gates and the
+            transits activating one of the natal gates.
+    """
+    if julian_day is None:
+        julian_day = julian_day_for(datetime.utcnow())
+
+    transits = transit_longitudes(table, julian_day)
+    natal_bodies = list(natal_positions)
+    natal = np.array([natal_positions[body] for body in natal_bodies], dtype=np.float64)
+
+    # Angular separation (0-180°) of every transit body to every natal body
+    separation = np.abs((transits[:, None] - natal[None, :] + 180) % 360 - 180)
+
+    aspects = []
+    for name, (angle, orb) in ASPECTS.items():
+        distance = np.abs(separation - angle)
+        for transit_index, natal_index in zip(*np.nonzero(distance <= orb)):
+            aspects.append({
+                "transit": TRANSIT_BODIES[transit_index],
+                "natal": natal_bodies[natal_index],
+                "aspect": name,
+                "orb": round(float(distance[transit_index, natal_index]), 2),
+            })
+    aspects.sort(key=lambda aspect: aspect["orb"])
+
+    transit_gates = gates_for(transits)
+    natal_gates = set(gates_for(natal).tolist())
+    return {
+        "julian_day": julian_day,
+        "aspects": aspects,
+        "gates": {body: int(gate) for body, gate in zip(TRANSIT_BODIES, transit_gates)},
+        "gate_activations": [
+            {"transit": body, "gate": int(gate)}
+            for body, gate in zip(TRANSIT_BODIES, transit_gates)
+            if gate in natal_gates
+        ],
+    }
+
+@transits_cli.command("build")
+@click.option("--days", type=int, default=30, show_default=True, help="Length of the window.")
+@click.option("--step-hours", type=float, default=1.0, show_default=True, help="Spacing between rows.")
+@click.option("--tier", type=click.Choice(["fast", "precise"]), help="Ephemeris precision tier.")
+def build(days, step_hours, tier):
+    """Precompute the rolling transit table, starting at yesterday 00:00 UTC."""
+    start = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=1)
+    table = build_transit_table(start, days, step_hours, tier)
+    path = current_app.config["TRANSIT_TABLE_PATH"]
+    save_transit_table(path, table)
+    click.echo(f"Wrote {len(table['julian_days'])} rows from {start:%Y-%m-%d} to {path}")
\ No newline at end of file
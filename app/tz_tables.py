@@ -0,0 +1,163 @@
+from collections import namedtuple
+from datetime import datetime
+from functools import lru_cache
+
+import numpy as np
+from pytz import timezone
+from pytz.tzinfo import DstTzInfo
+
+EPOCH = datetime(1970, 1, 1)
+SECONDS_PER_DAY = 86400
+JULIAN_DAY_AT_EPOCH = 2440587.5  # 1970-01-01 00:00 UTC
+
+# Policies for local times that occur twice (clocks turned back)
+AMBIGUOUS_POLICIES = ("standard", "later", "earlier", "raise")
+# Policies for local times that never occur (clocks turned forward)
+NONEXISTENT_POLICIES = ("pre", "post", "shift_forward", "raise")
+
+ZoneTable = namedtuple("ZoneTable", ["transitions", "offsets", "dst", "local_starts"])
+ZoneTable.__doc__ = """
+Transition history of one IANA zone as sorted NumPy arrays.
+
+transitions:  UTC instant (epoch seconds) at which each offset period starts.
+offsets:      UTC offset (seconds) in force from that instant.
+dst:          Whether that period is daylight saving time.
+local_starts: Local wall time (epoch seconds) at which each period starts.
+"""
+
+@lru_cache(maxsize=None)
+def compile_zone(timezone_name):
+    """
+    Compile an IANA zone's transition history into NumPy arrays.
+
+    Args:
+        timezone_name (str): IANA time zone name (e.g., "Europe/Bucharest").
+
+    Returns:
+        ZoneTable: The zone's transitions and offsets, oldest first.
+    """
+    zone = timezone(timezone_name)
+    if isinstance(zone, DstTzInfo):
+        transitions = [int((moment - EPOCH).total_seconds()) for moment in zone._utc_transition_times]
+        offsets = [int(info[0].total_seconds()) for info in zone._transition_info]
+        dst = [bool(info[1]) for info in zone._transition_info]
+    else:
+        # Fixed-offset zones (including UTC) have a single period
+        transitions = [int((datetime.min - EPOCH).total_seconds())]
+        offsets = [int(zone.utcoffset(datetime(2000, 1, 1)).total_seconds())]
+        dst = [False]
+
+    transitions = np.array(transitions, dtype=np.int64)
+    offsets = np.array(offsets, dtype=np.int64)
+    return ZoneTable(transitions, offsets, np.array(dst, dtype=bool), transitions + offsets)
+
+def local_to_utc_seconds(timezone_name, local_seconds, ambiguous="standard", nonexistent="pre"):
+    """
+    Convert local wall times to UTC for a whole array at once.
+
+    The defaults match `pytz.localize(..., is_dst=False)`, which is what the
+    single-chart code uses.
+
+    Args:
+        timezone_name (str): IANA time zone name.
+        local_seconds (array-like): Local wall times as epoch seconds (int64).
+        ambiguous (str): "standard" (the non-DST occurrence, else the later one),
+            "later" (second occurrence), "earlier" (first) or "raise".
+        nonexistent (str): "pre" (use the offset before the jump), "post" (offset after it),
+            "shift_forward" (move to the first valid instant) or "raise".
+
+    Returns:
+        numpy.ndarray: UTC epoch seconds (int64).
+
+    Raises:
+        ValueError: On an unknown policy, or an ambiguous/nonexistent time under "raise".
+    """
+    if ambiguous not in AMBIGUOUS_POLICIES:
+        raise ValueError(f"Unknown ambiguous-time policy: {ambiguous}")
+    if nonexistent not in NONEXISTENT_POLICIES:
+        raise ValueError(f"Unknown nonexistent-time policy: {nonexistent}")
+
+    table = compile_zone(timezone_name)
+    local_seconds = np.asarray(local_seconds, dtype=np.int64)
+    last = len(table.offsets) - 1
+
+    # Period whose wall-clock start is at or before each local time
+    index = np.clip(np.searchsorted(table.local_starts, local_seconds, side="right") - 1, 0, last)
+    utc_seconds = local_seconds - table.offsets[index]
+
+    # Nonexistent: the time falls in the jump before the next period starts
+    next_index = np.minimum(index + 1, last)
+    gap = (index < last) & (utc_seconds >= table.transitions[next_index])
+    if gap.any():
+        if nonexistent == "raise":
+            raise ValueError(f"Nonexistent local time in {timezone_name}: {_format_first(local_seconds, gap)}")
+        if nonexistent == "post":
+            utc_seconds = np.where(gap, local_seconds - table.offsets[next_index], utc_seconds)
+        elif nonexistent == "shift_forward":
+            utc_seconds = np.where(gap, table.transitions[next_index], utc_seconds)
+
+    # Ambiguous: the previous period also still covers the time
+    previous_index = np.maximum(index - 1, 0)
+    earlier_seconds = local_seconds - table.offsets[previous_index]
+    overlap = (index > 0) & (earlier_seconds < table.transitions[index]) & ~gap
+    if overlap.any():
+        if ambiguous == "raise":
+            raise ValueError(f"Ambiguous local time in {timezone_name}: {_format_first(local_seconds, overlap)}")
+        if ambiguous == "earlier":
+            utc_seconds = np.where(overlap, earlier_seconds, utc_seconds)
+        elif ambiguous == "standard":
+            # Only the earlier occurrence can win: it must be standard time while the later is DST
+            use_earlier = overlap & ~table.dst[previous_index] & table.dst[index]
+            utc_seconds = np.where(use_earlier, earlier_seconds, utc_seconds)
+
+    return utc_seconds
+
+def _format_first(local_seconds, mask):
+    return str(np.datetime64(int(local_seconds[mask][0]), "s"))
+
+def parse_local_times(dobs, birth_times):
+    """
+    Parse date and time strings into local epoch seconds.
+
+    Args:
+        dobs (array-like): Dates in YYYY-MM-DD format.
+        birth_times (array-like): Times in HH:MM format (24-hour).
+
+    Returns:
+        numpy.ndarray: Local wall times as epoch seconds (int64).
+    """
+    stamps = np.char.add(np.char.add(np.asarray(dobs, dtype=str), "T"), np.asarray(birth_times, dtype=str))
+    return stamps.astype("datetime64[s]").astype(np.int64)
+
+def utc_seconds_to_julian_day(utc_seconds):
+    """Convert UTC epoch seconds to Julian days (UT)."""
+    return np.asarray(utc_seconds, dtype=np.float64) / SECONDS_PER_DAY + JULIAN_DAY_AT_EPOCH
+
+def local_to_julian_day(timezone_names, dobs, birth_times, ambiguous="standard", nonexistent="pre"):
+    """
+    Convert local birth dates and times to Julian days (UT) in bulk.
+
+    Records are grouped by zone so each zone's table is searched once for
+    all of its records.
+
+    Args:
+        timezone_names (str or array-like): One IANA zone for all records, or one per record.
+        dobs (array-like): Dates in YYYY-MM-DD format.
+        birth_times (array-like): Times in HH:MM format (24-hour).
+        ambiguous (str): Policy for repeated local times (see `local_to_utc_seconds`).
+        nonexistent (str): Policy for skipped local times (see `local_to_utc_seconds`).
+
+    Returns:
+        numpy.ndarray: Julian days (float64).
+    """
+    local_seconds = parse_local_times(dobs, birth_times)
+    if isinstance(timezone_names, str):
+        utc_seconds = local_to_utc_seconds(timezone_names, local_seconds, ambiguous, nonexistent)
+        return utc_seconds_to_julian_day(utc_seconds)
+
+    zones, zone_index = np.unique(np.asarray(timezone_names, dtype=str), return_inverse=True)
+    utc_seconds = np.empty_like(local_seconds)
+    for position, zone in enumerate(zones):
+        mask = zone_index == position
+        utc_seconds[mask] = local_to_utc_seconds(zone, local_seconds[mask], ambiguous, nonexistent)
+    return utc_seconds_to_julian_day(utc_seconds)
\ No newline at end of file